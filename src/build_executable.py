@@ -17,10 +17,19 @@ Usage:
 """
 
 import argparse
+import concurrent.futures
+import getpass
+import hashlib
+import json
+import os
 import platform
 import shutil
+import string
 import subprocess
 import sys
+import tarfile
+import threading
+import zipfile
 from pathlib import Path
 import logging
 
@@ -34,46 +43,35 @@ FFMPEG_VERSION = '6.1'
 # Documentation files to include in distribution
 DOCS_TO_INCLUDE = ['README.md', 'LICENSE', 'config.yaml.example']
 
-logger = logging.getLogger(__name__)
+# gzip level for the distribution tarball. The payload is mostly executables that
+# barely compress further, so higher levels cost a lot of time for little gain.
+GZIP_COMPRESS_LEVEL = 1
 
-def get_platform():
-    """Detect the current platform."""
-    system = platform.system().lower()
-    if system == 'darwin':
-        return 'macos'
-    elif system == 'windows':
-        return 'windows'
-    elif system == 'linux':
-        return 'linux'
-    else:
-        raise RuntimeError(f"Unsupported platform: {system}")
+# Members of the distribution zip stored without compression: PyInstaller
+# executables are already compressed, so deflating them again gains <1%
+ZIP_STORED_SUFFIXES = ('.exe', '.dll')
 
+# PyInstaller version used for builds (6.6+ is needed for PYINSTALLER_OPTIMIZE_LEVEL)
+PYINSTALLER_VERSION = '6.10.0'
 
-def install_pyinstaller():
-    """Install PyInstaller if not already installed."""
-    try:
-        import PyInstaller
-        logger.info(
-            f"PyInstaller is already installed (version {PyInstaller.__version__})")
-    except ImportError:
-        logger.info("Installing PyInstaller...")
-        subprocess.check_call(
-            [sys.executable, '-m', 'pip', 'install', 'pyinstaller'])
-        logger.info("PyInstaller installed successfully")
+# RAM-backed directory (Linux) for the PyInstaller work directory with --ram-workpath
+RAM_DISK_DIR = '/dev/shm'
 
+# Records the inputs each executable in dist/ was built from, so unchanged
+# executables are not rebuilt
+BUILD_MANIFEST_NAME = '.convert_videos.manifest.json'
 
-def create_spec_file(platform_name, binaries_data, script_name='convert_videos.py',
-                     exe_name='convert_videos', console=True):
-    """Create PyInstaller spec file for the application.
+# Bytecode optimization level for bundled modules (like python -OO: strips asserts
+# and docstrings). Requires PyInstaller 6.6+.
+PYINSTALLER_OPTIMIZE_LEVEL = 2
 
-    Args:
-        platform_name: Target platform ('windows', 'linux', 'macos')
-        binaries_data: Dict containing binary paths to bundle
-        script_name: Python script to build (default: 'convert_videos.py')
-        exe_name: Name for the output executable (default: 'convert_videos')
-        console: Whether to show console window (default: True for CLI, False for GUI)
-    """
-    spec_content = f"""# -*- mode: python ; coding: utf-8 -*-
+# Binaries never UPX-compressed even with --upx: the bundled tools are large, so
+# packing them costs the most build time, and UPX breaks the MSVC runtime DLL
+UPX_EXCLUDE = ['HandBrakeCLI', 'HandBrakeCLI.exe', 'ffmpeg', 'ffmpeg.exe', 'ffprobe', 'ffprobe.exe',
+               'vcruntime140.dll']
+
+# PyInstaller spec file template (string.Template, so the spec's own braces need no escaping)
+SPEC_TEMPLATE = string.Template("""# -*- mode: python ; coding: utf-8 -*-
 
 block_cipher = None
 
@@ -84,41 +82,22 @@ datas = []
 binaries = []
 
 # Add external binaries if provided
-"""
-
-    if binaries_data:
-        spec_content += f"# Bundled binaries\n"
-        if 'handbrake' in binaries_data and binaries_data['handbrake']:
-            handbrake_path = repr(binaries_data['handbrake'])
-            spec_content += f"binaries.append(({handbrake_path}, '.'))\n"
-        if 'ffmpeg' in binaries_data and binaries_data['ffmpeg']:
-            ffmpeg_info = binaries_data['ffmpeg']
-            ffmpeg_binary = ffmpeg_info.get(
-                'ffmpeg') if isinstance(ffmpeg_info, dict) else None
-            ffprobe_binary = ffmpeg_info.get(
-                'ffprobe') if isinstance(ffmpeg_info, dict) else None
-            if ffmpeg_binary:
-                ffmpeg_path = repr(ffmpeg_binary)
-                spec_content += f"binaries.append(({ffmpeg_path}, '.'))\n"
-            if ffprobe_binary:
-                ffprobe_path = repr(ffprobe_binary)
-                spec_content += f"binaries.append(({ffprobe_path}, '.'))\n"
-
-    spec_content += f"""
+${binaries_block}
 a = Analysis(
-    ['{script_name}'],
+    [${script_name}],
     pathex=[],
     binaries=binaries,
     datas=datas,
     hiddenimports=['yaml', 'tkinter', 'imagehash', 'PIL.Image', 'PIL.ImageTk'],
     hookspath=[],
-    hooksconfig={{}},
+    hooksconfig={},
     runtime_hooks=[],
     excludes=[],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
+    optimize=${optimize},
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
@@ -130,27 +109,93 @@ exe = EXE(
     a.zipfiles,
     a.datas,
     [],
-    name='{exe_name}',
+    name=${exe_name},
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
+    upx=${upx},
+    upx_exclude=${upx_exclude},
     runtime_tmpdir=None,
-    console={console},
+    console=${console},
     disable_windowed_traceback=False,
     argv_emulation=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-"""
+${icon_line})
+""")
 
-    if platform_name == 'macos':
-        spec_content += "    icon=None,\n"
-    elif platform_name == 'windows':
-        spec_content += "    icon=None,\n"
+logger = logging.getLogger(__name__)
+
+def get_platform():
+    """Detect the current platform."""
+    system = platform.system().lower()
+    if system == 'darwin':
+        return 'macos'
+    elif system == 'windows':
+        return 'windows'
+    elif system == 'linux':
+        return 'linux'
+    else:
+        raise RuntimeError(f"Unsupported platform: {system}")
+
+
+def install_pyinstaller():
+    """Install the pinned PyInstaller version if it is not already installed."""
+    try:
+        import PyInstaller
+        if PyInstaller.__version__ == PYINSTALLER_VERSION:
+            logger.info(
+                f"PyInstaller is already installed (version {PyInstaller.__version__})")
+            return
+        logger.info(f"Replacing PyInstaller {PyInstaller.__version__} with {PYINSTALLER_VERSION}...")
+    except ImportError:
+        logger.info("Installing PyInstaller...")
+    subprocess.check_call(
+        [sys.executable, '-m', 'pip', 'install', '--disable-pip-version-check', '--no-input', '--quiet',
+         '--prefer-binary', f'pyinstaller=={PYINSTALLER_VERSION}'])
+    logger.info("PyInstaller installed successfully")
+
+
+def create_spec_file(platform_name, binaries_data, script_name='convert_videos.py',
+                     exe_name='convert_videos', console=True, upx=False):
+    """Create PyInstaller spec file for the application.
 
-    spec_content += ")\n"
+    Args:
+        platform_name: Target platform ('windows', 'linux', 'macos')
+        binaries_data: Dict containing binary paths to bundle
+        script_name: Python script to build (default: 'convert_videos.py')
+        exe_name: Name for the output executable (default: 'convert_videos')
+        console: Whether to show console window (default: True for CLI, False for GUI)
+        upx: Whether to UPX-compress the executable (default: False; slows down
+             both the build and every startup)
+    """
+    # Collect the external binaries to bundle
+    bundled_binaries = []
+    if binaries_data:
+        if binaries_data.get('handbrake'):
+            bundled_binaries.append(binaries_data['handbrake'])
+        ffmpeg_info = binaries_data.get('ffmpeg')
+        if isinstance(ffmpeg_info, dict):
+            bundled_binaries.extend(
+                ffmpeg_info[name] for name in ('ffmpeg', 'ffprobe') if ffmpeg_info.get(name))
+
+    binaries_block = ''
+    if bundled_binaries:
+        # repr() of the resolved path keeps Windows backslashes and spaces intact
+        binaries_block = '# Bundled binaries\n' + ''.join(
+            f"binaries.append(({str(Path(binary).resolve())!r}, '.'))\n" for binary in bundled_binaries)
+
+    spec_content = SPEC_TEMPLATE.substitute(
+        binaries_block=binaries_block,
+        script_name=repr(script_name),
+        exe_name=repr(exe_name),
+        upx=upx,
+        upx_exclude=repr(UPX_EXCLUDE),
+        optimize=PYINSTALLER_OPTIMIZE_LEVEL,
+        console=console,
+        icon_line='    icon=None,\n' if platform_name in ('macos', 'windows') else '',
+    )
 
     # Create spec file in the src directory (where this script is located)
     src_dir = Path(__file__).parent
@@ -163,10 +208,81 @@ exe = EXE(
     return spec_file
 
 
-def build_with_pyinstaller(spec_file):
+def get_build_fingerprint(spec_file, input_files):
+    """Get a digest of everything a PyInstaller build depends on.
+
+    Covers the spec file, the given input files (sources and bundled binaries),
+    and the PyInstaller and Python versions.
+
+    Returns:
+        str: SHA256 hex digest, or None if an input can't be read
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f'{PYINSTALLER_VERSION}\0{sys.version}\0'.encode('utf-8'))
+    try:
+        for input_file in [spec_file, *input_files]:
+            hasher.update(f'{Path(input_file).name}\0'.encode('utf-8'))
+            with open(input_file, 'rb') as f:
+                hasher.update(hashlib.file_digest(f, 'sha256').digest())
+    except OSError as e:
+        logger.warning(f"Could not fingerprint build inputs: {repr(e)}")
+        return None
+    return hasher.hexdigest()
+
+
+def load_build_manifest(manifest_path):
+    """Load the build manifest, or an empty one if it is missing or unreadable."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_build_manifest(manifest_path, manifest):
+    """Write the build manifest."""
+    try:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logger.warning(f"Could not write build manifest {manifest_path}: {repr(e)}")
+
+
+def get_pyinstaller_work_dir(in_memory=False):
+    """Get the PyInstaller work directory.
+
+    It lives in the user cache directory ($XDG_CACHE_HOME, default ~/.cache) rather
+    than the project, so PyInstaller's analysis cache survives cleaning build/.
+
+    Args:
+        in_memory: Use a directory on the RAM-backed RAM_DISK_DIR instead, if it
+                   exists. Its cache then lasts until reboot.
+    """
+    if in_memory:
+        if os.path.isdir(RAM_DISK_DIR) and os.access(RAM_DISK_DIR, os.W_OK):
+            try:
+                user = getpass.getuser()
+            except (KeyError, OSError):
+                # No USER/LOGNAME and no passwd entry (e.g. an arbitrary container UID)
+                user = str(os.getuid())
+            return Path(RAM_DISK_DIR) / f'convert_videos-{user}' / 'pyinstaller'
+        logger.info(f"{RAM_DISK_DIR} is not available, using the on-disk PyInstaller work directory")
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'convert_videos' / 'pyinstaller'
+
+
+def build_with_pyinstaller(spec_file, clean=False, in_memory_workpath=False):
     """Run PyInstaller with the spec file.
     
     Runs from the src directory so all imports work naturally.
+
+    Args:
+        spec_file: Path to the spec file to build
+        clean: If True, pass --clean so PyInstaller discards its cache and work
+               directory. By default the cache is reused for faster rebuilds.
+        in_memory_workpath: If True, keep the work directory in RAM when possible
+                            (see get_pyinstaller_work_dir)
     """
     logger.info(f"Building executable with PyInstaller...")
     try:
@@ -180,13 +296,23 @@ def build_with_pyinstaller(spec_file):
         dist_dir = repo_root / 'dist'
         dist_dir.mkdir(exist_ok=True)
 
-        work_dir = repo_root / 'build'
-        work_dir.mkdir(exist_ok=True)
+        work_dir = get_pyinstaller_work_dir(in_memory=in_memory_workpath)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        command_args = [sys.executable, '-m', 'PyInstaller', str(spec_file), '--noconfirm',
+                        '--distpath', dist_dir, '--workpath', work_dir]
+        if clean:
+            command_args.append('--clean')
+
+        # Don't store column position tables in the bundled bytecode (Python 3.11+).
+        # Each spec also gets its own PyInstaller config dir: the binary cache in it
+        # (stripped/UPX-compressed libraries and their index) isn't safe to share
+        # between builds running in parallel
+        env = {**os.environ, 'PYTHONNODEBUGRANGES': '1',
+               'PYINSTALLER_CONFIG_DIR': str(work_dir / 'config' / Path(spec_file).stem)}
 
         # Run PyInstaller from the src directory
-        subprocess.check_call(
-            [sys.executable, '-m', 'PyInstaller', str(spec_file), '--clean', '--noconfirm', '--distpath', dist_dir, '--workpath', work_dir],
-            cwd=str(src_dir))
+        subprocess.check_call(command_args, cwd=str(src_dir), env=env)
         logger.info("Build completed successfully!")
         return True
     except subprocess.CalledProcessError as e:
@@ -194,6 +320,47 @@ def build_with_pyinstaller(spec_file):
         return False
 
 
+def create_tar_gz_archive(package_files, archive_path):
+    """Create a .tar.gz holding package_files, a list of (source path, name in archive).
+
+    Members are named ./<name> (the layout shutil.make_archive produced).
+    Compresses with pigz (parallel gzip) when it is installed, otherwise with
+    tarfile's built-in gzip.
+    """
+    def add_files(tar):
+        for source_path, arcname in package_files:
+            tar.add(source_path, arcname=f'./{arcname}')
+
+    pigz_path = shutil.which('pigz')
+    if pigz_path:
+        logger.info(f"Compressing with pigz: {pigz_path}")
+        with open(archive_path, 'wb') as archive_file:
+            with subprocess.Popen([pigz_path, f'-{GZIP_COMPRESS_LEVEL}', '-c'],
+                                  stdin=subprocess.PIPE, stdout=archive_file) as pigz:
+                with tarfile.open(fileobj=pigz.stdin, mode='w|') as tar:
+                    add_files(tar)
+                pigz.stdin.close()
+        if pigz.returncode != 0:
+            raise subprocess.CalledProcessError(pigz.returncode, [pigz_path])
+    else:
+        with tarfile.open(archive_path, 'w:gz', compresslevel=GZIP_COMPRESS_LEVEL) as tar:
+            add_files(tar)
+    return archive_path
+
+
+def create_zip_archive(package_files, archive_path):
+    """Create a .zip holding package_files, a list of (source path, name in archive).
+
+    Executables are stored as-is, everything else (the docs) is deflated.
+    """
+    with zipfile.ZipFile(archive_path, 'w') as zip_file:
+        for source_path, arcname in package_files:
+            compress_type = zipfile.ZIP_STORED if Path(arcname).suffix.lower() in ZIP_STORED_SUFFIXES \
+                else zipfile.ZIP_DEFLATED
+            zip_file.write(source_path, arcname, compress_type=compress_type)
+    return archive_path
+
+
 def create_distribution_package(platform_name):
     """Create a distributable archive with the executables and necessary files."""
     # PyInstaller creates dist directory in src when run from src
@@ -221,35 +388,22 @@ def create_distribution_package(platform_name):
         logger.error(f"Error: GUI executable not found at {gui_exe_path}")
         sys.exit(1)
 
-    # Create package directory
-    package_name = f'convert_videos-{platform_name}'
-    package_dir = dist_dir / package_name
-    package_dir.mkdir(exist_ok=True)
-
-    # Copy CLI executable
-    shutil.copy2(cli_exe_path, package_dir / cli_exe_name)
-    logger.info(f"Packaged CLI executable: {cli_exe_name}")
-
-    shutil.copy2(dd_exe_path, package_dir / dd_exe_name)
-    logger.info(f"Packaged DD executable: {dd_exe_name}")
-
-    shutil.copy2(gui_exe_path, package_dir / gui_exe_name)
-    logger.info(f"Packaged GUI executable: {gui_exe_name}")
-
-    # Copy documentation files from repo root
+    # The archive is written straight from dist/ and the repo root, without
+    # staging copies of the files in a package directory first
+    package_files = [(cli_exe_path, cli_exe_name), (dd_exe_path, dd_exe_name), (gui_exe_path, gui_exe_name)]
     for doc in DOCS_TO_INCLUDE:
         doc_path = repo_root / doc
-        if doc_path.exists():
-            shutil.copy2(doc_path, package_dir / doc)
+        if doc_path.is_file():
+            package_files.append((doc_path, doc))
 
     # Create archive
-    archive_name = f"{package_name}"
+    archive_name = f'convert_videos-{platform_name}'
     if platform_name == 'windows':
         archive_path = dist_dir / f"{archive_name}.zip"
-        shutil.make_archive(str(dist_dir / archive_name), 'zip', package_dir)
+        create_zip_archive(package_files, archive_path)
     else:
         archive_path = dist_dir / f"{archive_name}.tar.gz"
-        shutil.make_archive(str(dist_dir / archive_name), 'gztar', package_dir)
+        create_tar_gz_archive(package_files, archive_path)
 
     logger.info(f"Created distribution package: {archive_path}")
     return archive_path
@@ -260,8 +414,22 @@ def main():
         description='Build portable executable for convert_videos')
     parser.add_argument('--platform', choices=['windows', 'linux', 'macos'],
                         help='Target platform (default: auto-detect)')
+    parser.add_argument('--fresh-pyinstaller', action='store_true',
+                        help='Discard the PyInstaller cache and rebuild from scratch (passes --clean)')
+    parser.add_argument('--force-redownload', action='store_true',
+                        help='Download HandBrakeCLI and FFmpeg even if valid binaries already exist')
+    parser.add_argument('--upx', action='store_true',
+                        help='UPX-compress the executables (smaller, but slower to build and start)')
+    parser.add_argument('--ram-workpath', action='store_true',
+                        help=f'Keep the PyInstaller work directory in {RAM_DISK_DIR} (Linux) for faster builds '
+                             'on slow disks')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of PyInstaller builds to run in parallel (default: 1). '
+                             '--fresh-pyinstaller always builds one at a time')
 
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
 
     # Determine platform
     target_platform = args.platform if args.platform else get_platform()
@@ -275,10 +443,11 @@ def main():
     repo_root = Path(__file__).parent.parent
     binaries_data = {}
     download_dir = repo_root / 'external_binaries'
-    download_dir.mkdir(exist_ok=True)
 
+    # Keep the downloaded archives so repeat builds don't fetch them again
     handbrake_path, ffprobe_path, ffmpeg_path = dependencies_utils.download_dependencies(
-        download_dir)
+        download_dir, force_download=args.force_redownload,
+        cache_dir=download_dir / dependencies_utils.DOWNLOAD_CACHE_DIR_NAME)
     binaries_data['handbrake'] = handbrake_path
     binaries_data['ffmpeg'] = {
         'ffmpeg': ffmpeg_path,
@@ -307,7 +476,8 @@ def main():
         binaries_data,
         script_name='convert_videos_cli.py',
         exe_name='convert_videos_cli',
-        console=True
+        console=True,
+        upx=args.upx
     )
 
     # CLI version of duplicate detector
@@ -316,7 +486,8 @@ def main():
         binaries_data,
         script_name='duplicate_detector.py',
         exe_name='duplicate_detector',
-        console=True
+        console=True,
+        upx=args.upx
     )
 
     # GUI version without console
@@ -325,37 +496,75 @@ def main():
         binaries_data,
         script_name='convert_videos_gui.py',
         exe_name='convert_videos_gui',
-        console=False
+        console=False,
+        upx=args.upx
     )
 
-    # Build executables with PyInstaller
-    logger.info("Building CLI executable...")
-    cli_success = build_with_pyinstaller(spec_file_cli)
-
-    if not cli_success:
-        logger.error("[FAILED] CLI build failed!")
-        sys.exit(1)
-
-    logger.info("Building Duplicate Detector executable...")
-    dup_dd_success = build_with_pyinstaller(spec_file_duplicate_detector)
-
-    if not dup_dd_success:
-        logger.error("[FAILED] DupDetector build failed!")
-        sys.exit(1)
-
-    logger.info("Building GUI executable...")
-    gui_success = build_with_pyinstaller(spec_file_gui)
-
-    if not gui_success:
-        logger.error("[WARNING] GUI build failed, but CLI build succeeded, This might happen if tkinter is not available")
-        sys.exit(1)
+    # Build executables with PyInstaller, up to --jobs at a time
+    exe_extension = '.exe' if target_platform == 'windows' else ''
+    builds = [
+        ("CLI", spec_file_cli, f'convert_videos_cli{exe_extension}', "[FAILED] CLI build failed!"),
+        ("Duplicate Detector", spec_file_duplicate_detector, f'duplicate_detector{exe_extension}',
+         "[FAILED] DupDetector build failed!"),
+        ("GUI", spec_file_gui, f'convert_videos_gui{exe_extension}',
+         "[WARNING] GUI build failed, but CLI build succeeded, This might happen if tkinter is not available"),
+    ]
+
+    # Skip builds whose inputs are unchanged since the executable in dist/ was built
+    dist_dir = repo_root / 'dist'
+    manifest_path = dist_dir / BUILD_MANIFEST_NAME
+    manifest = load_build_manifest(manifest_path)
+    build_inputs = sorted(Path(__file__).parent.glob('*.py')) + [
+        repo_root / 'requirements.txt', handbrake_path, ffmpeg_path, ffprobe_path]
+    fingerprints = {exe_file: get_build_fingerprint(spec_file, build_inputs)
+                    for _, spec_file, exe_file, _ in builds}
+
+    build_failed = threading.Event()
+
+    def run_build(build_name, spec_file, exe_file):
+        # Don't start queued builds once one has failed
+        if build_failed.is_set():
+            return None
+        fingerprint = fingerprints[exe_file]
+        if not args.fresh_pyinstaller and fingerprint and manifest.get(exe_file) == fingerprint \
+                and (dist_dir / exe_file).exists():
+            logger.info(f"{build_name} executable is up to date, skipping build")
+            return True
+        logger.info(f"Building {build_name} executable...")
+        success = build_with_pyinstaller(spec_file, clean=args.fresh_pyinstaller,
+                                         in_memory_workpath=args.ram_workpath)
+        if not success:
+            build_failed.set()
+        return success
+
+    # Each build has its own PyInstaller cache, but a clean build is also the slow,
+    # rare case where running one at a time is the safer trade-off
+    jobs = 1 if args.fresh_pyinstaller else args.jobs
+    if jobs != args.jobs:
+        logger.info("--fresh-pyinstaller builds one at a time")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(run_build, build_name, spec_file, exe_file)
+                   for build_name, spec_file, exe_file, _ in builds]
+        results = [future.result() for future in futures]
+
+    updated_manifest = {exe_file: fingerprints[exe_file]
+                        for (_, _, exe_file, _), success in zip(builds, results)
+                        if success and fingerprints[exe_file]}
+    if updated_manifest != manifest:
+        save_build_manifest(manifest_path, updated_manifest)
+
+    # Builds are started in order, so any failure is reported before the builds it skipped
+    for (_, _, _, failure_message), success in zip(builds, results):
+        if not success:
+            logger.error(failure_message)
+            sys.exit(1)
 
     # Create distribution package
     logger.info("Creating distribution package...")
     create_distribution_package(target_platform)
 
     logger.info("[SUCCESS] Build completed successfully!")
-    exe_extension = '.exe' if target_platform == 'windows' else ''
     logger.info(f"Executable locations:")
     logger.info(f"  CLI: src/dist/convert_videos_cli{exe_extension}")
     logger.info(f"  DD: src/dist/duplicate_detector{exe_extension}")
@@ -7,7 +7,6 @@ Configuration manager
 import logging
 import logging.handlers
 import os
-import re
 from pathlib import Path
 
 import yaml
@@ -15,15 +14,40 @@ import yaml
 import dependencies_utils
 
 # Constants
-SUPPORTED_ENCODERS = ['x265', 'x265_10bit', 'nvenc_hevc']
-SUPPORTED_FORMATS = ['mkv', 'mp4']
+# 'auto' uses nvenc_hevc if HandBrakeCLI can use an NVIDIA GPU, otherwise x265_10bit
+SUPPORTED_ENCODERS = ('x265', 'x265_10bit', 'nvenc_hevc', 'auto')
+SUPPORTED_FORMATS = ('mkv', 'mp4')
 # x265 CPU encoder presets
-X265_PRESETS = ['ultrafast', 'superfast', 'veryfast',
-                'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow']
+X265_PRESETS = ('ultrafast', 'superfast', 'veryfast',
+                'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow')
 # NVENC GPU encoder presets (HandBrake-compatible)
-NVENC_PRESETS = ['default', 'fast', 'medium', 'slow']
-# All supported presets (combined)
-SUPPORTED_PRESETS = X265_PRESETS + NVENC_PRESETS
+NVENC_PRESETS = ('default', 'fast', 'medium', 'slow')
+# All supported presets (combined, without the names both encoders share)
+SUPPORTED_PRESETS = X265_PRESETS + tuple(preset for preset in NVENC_PRESETS if preset not in X265_PRESETS)
+# Sets for membership checks; the tuples above keep the order shown to users
+_SUPPORTED_ENCODER_SET = frozenset(SUPPORTED_ENCODERS)
+_SUPPORTED_FORMAT_SET = frozenset(SUPPORTED_FORMATS)
+_SUPPORTED_PRESET_SET = frozenset(SUPPORTED_PRESETS)
+_X265_PRESET_SET = frozenset(X265_PRESETS)
+_NVENC_PRESET_SET = frozenset(NVENC_PRESETS)
+# Closest equivalent when a preset meant for the other encoder is configured
+_NVENC_TO_X265_PRESETS = {
+    'default': 'medium',
+    'slow': 'slow',
+    'medium': 'medium',
+    'fast': 'fast'
+}
+_X265_TO_NVENC_PRESETS = {
+    'ultrafast': 'fast',
+    'superfast': 'fast',
+    'veryfast': 'fast',
+    'faster': 'fast',
+    'fast': 'fast',
+    'medium': 'medium',
+    'slow': 'slow',
+    'slower': 'slow',
+    'veryslow': 'slow'
+}
 SIZE_MULTIPLIERS = {
     'B': 1,
     'KB': 1024,
@@ -31,25 +55,27 @@ SIZE_MULTIPLIERS = {
     'GB': 1024 ** 3
 }
 DEFAULT_MIN_FILE_SIZE_BYTES = 1024 ** 3  # 1GB
-FILE_SIZE_PATTERN = re.compile(
-    r'^(\d+(?:\.\d+)?)\s*(GB|MB|KB|B)?$', re.IGNORECASE)
+# Config sections that are merged key by key into their defaults
+NESTED_CONFIG_SECTIONS = ('output', 'dependencies', 'logging')
+# libyaml's C parser when PyYAML was built with it, else the pure-Python safe loader
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 logger = logging.getLogger(__name__)
 
 
 def validate_encoder(encoder_type):
     """Validate that the encoder type is supported."""
-    return encoder_type in SUPPORTED_ENCODERS
+    return encoder_type in _SUPPORTED_ENCODER_SET
 
 
 def validate_format(format_type):
     """Validate that the output format is supported."""
-    return format_type in SUPPORTED_FORMATS
+    return format_type in _SUPPORTED_FORMAT_SET
 
 
 def validate_preset(preset):
     """Validate that the encoder preset is supported."""
-    return preset in SUPPORTED_PRESETS
+    return preset in _SUPPORTED_PRESET_SET
 
 
 def validate_quality(quality):
@@ -61,44 +87,30 @@ def validate_quality(quality):
         return False
 
 
+def validate_jobs(jobs):
+    """Validate that the number of parallel conversions is a positive integer."""
+    return isinstance(jobs, int) and not isinstance(jobs, bool) and jobs >= 1
+
+
 def map_preset_for_encoder(preset, encoder_type):
     """Map x265-style presets to encoder-specific presets when needed.
 
     For x265/x265_10bit: returns the preset as-is if valid
     For nvenc_hevc: maps x265 presets to NVENC equivalents, or returns NVENC preset as-is
     """
-    if encoder_type in ['x265', 'x265_10bit']:
+    if encoder_type in ('x265', 'x265_10bit'):
         # x265 encoders use their own preset names
-        if preset in X265_PRESETS:
+        if preset in _X265_PRESET_SET:
             return preset
         # If using an NVENC preset with x265, map to closest equivalent
-        nvenc_to_x265_map = {
-            'default': 'medium',
-            'slow': 'slow',
-            'medium': 'medium',
-            'fast': 'fast'
-        }
-        return nvenc_to_x265_map.get(preset, 'medium')
+        return _NVENC_TO_X265_PRESETS.get(preset, 'medium')
 
     elif encoder_type == 'nvenc_hevc':
         # NVENC encoder: map x265 presets to NVENC equivalents
-        if preset in NVENC_PRESETS:
+        if preset in _NVENC_PRESET_SET:
             # Already an NVENC preset
             return preset
-
-        # Map x265 presets to NVENC presets
-        x265_to_nvenc_map = {
-            'ultrafast': 'fast',
-            'superfast': 'fast',
-            'veryfast': 'fast',
-            'faster': 'fast',
-            'fast': 'fast',
-            'medium': 'medium',
-            'slow': 'slow',
-            'slower': 'slow',
-            'veryslow': 'slow'
-        }
-        return x265_to_nvenc_map.get(preset, 'medium')
+        return _X265_TO_NVENC_PRESETS.get(preset, 'medium')
 
     return preset
 
@@ -112,15 +124,21 @@ def parse_file_size(size_str):
 
     size_str = str(size_str).strip().upper()
 
-    # Match number and optional unit
-    match = FILE_SIZE_PATTERN.match(size_str)
-    if not match:
-        raise ValueError(f"Invalid file size format: {size_str}")
+    # Split off the optional unit (KB/MB/GB or a bare B); spaces may precede it
+    if size_str[-2:] in SIZE_MULTIPLIERS:
+        unit = size_str[-2:]
+    elif size_str.endswith('B'):
+        unit = 'B'
+    else:
+        unit = ''
+    number_str = size_str[:len(size_str) - len(unit)].rstrip()
 
-    number = float(match.group(1))
-    unit = match.group(2) or 'B'
+    # The number is digits with an optional fractional part (no sign or exponent)
+    integer_part, point, fraction_part = number_str.partition('.')
+    if not integer_part.isdecimal() or (point and not fraction_part.isdecimal()):
+        raise ValueError(f"Invalid file size format: {size_str}")
 
-    return int(number * SIZE_MULTIPLIERS[unit])
+    return int(float(number_str) * SIZE_MULTIPLIERS[unit or 'B'])
 
 
 def prepare_default_config():
@@ -131,7 +149,8 @@ def prepare_default_config():
             'format': 'mkv',
             'encoder': 'x265_10bit',
             'preset': 'medium',
-            'quality': 24
+            'quality': 24,
+            'hw_decoding': False
         },
         'dependencies': {
             'handbrake': 'HandBrakeCLI',
@@ -143,7 +162,8 @@ def prepare_default_config():
         },
         'remove_original_files': False,
         'loop': False,
-        'dry_run': False
+        'dry_run': False,
+        'jobs': 1
     }
 
 
@@ -173,6 +193,7 @@ def post_process_configuration(config, args):
     encoder_type = output_config.get('encoder', 'x265_10bit')
     encoder_preset = output_config.get('preset', 'medium')
     quality = output_config.get('quality', 24)
+    hw_decoding = output_config.get('hw_decoding', False)
 
     validation_issues = []
 
@@ -196,6 +217,10 @@ def post_process_configuration(config, args):
         validation_issues.append(
             f"Invalid quality value: {quality!r}. Must be an integer between 0 and 51.")
 
+    if not isinstance(hw_decoding, bool):
+        validation_issues.append(
+            f"Invalid hw_decoding value: {hw_decoding!r}. Must be true or false.")
+
     # Map preset to encoder-specific preset
     effective_preset = map_preset_for_encoder(
         encoder_preset, encoder_type)
@@ -211,6 +236,7 @@ def post_process_configuration(config, args):
     config['output']['encoder'] = encoder_type
     config['output']['preset'] = encoder_preset
     config['output']['quality'] = quality
+    config['output']['hw_decoding'] = hw_decoding
 
     config['directory'] = args.directory if args and args.directory else config.get('directory')
    
@@ -224,6 +250,10 @@ def post_process_configuration(config, args):
 
     config['dry_run'] = args.dry_run if args and args.dry_run else config.get('dry_run', False)
     config['loop'] = args.loop if args and args.loop else config.get('loop', False)
+    config['jobs'] = args.jobs if args and getattr(args, 'jobs', None) is not None else config.get('jobs', 1)
+    if not validate_jobs(config['jobs']):
+        validation_issues.append(
+            f"Invalid jobs value: {config['jobs']!r}. Must be a positive integer.")
     config['remove_original_files'] = config.get('remove_original_files', False)
     if args and args.remove_original_files:
         config['remove_original_files'] = True
@@ -259,7 +289,7 @@ def load_config(config_path=None, args=None):
     else:
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                user_config = yaml.safe_load(f)
+                user_config = yaml.load(f, Loader=YAML_LOADER)
                 # Handle None, False, or other falsy/invalid values
                 if not isinstance(user_config, dict):
                     user_config = {}
@@ -267,44 +297,15 @@ def load_config(config_path=None, args=None):
             # Merge with defaults
             config = {**default_config, **user_config}
 
-            # Merge output settings if present, handling None and type safety
-            if 'output' in user_config:
-                if user_config['output'] is None:
-                    # User explicitly set output: null; restore default nested output config
-                    config['output'] = default_config['output']
-                elif isinstance(user_config['output'], dict):
-                    # Merge user-provided output settings into the default output config
-                    config['output'] = {
-                        **default_config['output'], **user_config['output']}
-                else:
-                    # Invalid output type; fall back to defaults to avoid runtime errors
-                    config['output'] = default_config['output']
-
-            # Merge dependencies settings if present, handling None and type safety
-            if 'dependencies' in user_config:
-                if user_config['dependencies'] is None:
-                    # User explicitly set dependencies: null; restore default dependencies config
-                    config['dependencies'] = default_config['dependencies']
-                elif isinstance(user_config['dependencies'], dict):
-                    # Merge user-provided dependencies settings into the default dependencies config
-                    config['dependencies'] = {
-                        **default_config['dependencies'], **user_config['dependencies']}
-                else:
-                    # Invalid dependencies type; fall back to defaults to avoid runtime errors
-                    config['dependencies'] = default_config['dependencies']
-
-            # Merge logging settings if present, handling None and type safety
-            if 'logging' in user_config:
-                if user_config['logging'] is None:
-                    # User explicitly set logging: null; restore default logging config
-                    config['logging'] = default_config['logging']
-                elif isinstance(user_config['logging'], dict):
-                    # Merge user-provided logging settings into the default logging config
-                    config['logging'] = {
-                        **default_config['logging'], **user_config['logging']}
-                else:
-                    # Invalid logging type; fall back to defaults to avoid runtime errors
-                    config['logging'] = default_config['logging']
+            # Merge nested sections into their defaults. A section set to null (or
+            # to an invalid type) falls back to the defaults to avoid runtime errors
+            for section in NESTED_CONFIG_SECTIONS:
+                if section in user_config:
+                    user_section = user_config[section]
+                    if isinstance(user_section, dict):
+                        config[section] = {**default_config[section], **user_section}
+                    else:
+                        config[section] = default_config[section]
 
             logger.info(f"Loaded configuration from {config_path}")
         except (OSError, IOError, yaml.YAMLError) as e:
@@ -10,10 +10,17 @@ This script will:
 4. Validate the conversion by comparing durations
 """
 
+import concurrent.futures
+import functools
 import logging
 import logging.handlers
+import operator
+import os
+import shutil
+import sqlite3
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
 import configuration_manager
@@ -21,6 +28,34 @@ import subprocess_utils
 
 logger = logging.getLogger(__name__)
 
+# Extensions (lowercase) of the video files picked up by scans
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mkv', '.mov', '.avi'})
+
+# Number of ffprobe processes run at once when scanning for eligible files
+CODEC_PROBE_WORKERS = min(8, os.cpu_count() or 1)
+
+# Probed codecs are cached by path, modification time and size, so rescans only
+# probe new or changed files. Set CONVERT_VIDEOS_CODEC_CACHE=0 to disable.
+CODEC_CACHE_ENV_VAR = 'CONVERT_VIDEOS_CODEC_CACHE'
+
+# Largest difference between the source and output durations that still counts
+# as a complete conversion. Durations are compared unrounded, so a truncated
+# output is caught even when the loss is under two seconds.
+DURATION_TOLERANCE_SECONDS = 1.0
+
+# HandBrakeCLI runs at a lower priority. How is decided once here rather than
+# per file: Windows gets BELOW_NORMAL_PRIORITY_CLASS, elsewhere the command is
+# prefixed with nice if it is installed.
+if sys.platform == 'win32':
+    _HANDBRAKE_PREFIX = ()
+    _HANDBRAKE_RUN_KWARGS = {'creationflags': 0x00004000}  # BELOW_NORMAL_PRIORITY_CLASS
+elif shutil.which('nice'):
+    _HANDBRAKE_PREFIX = ('nice', '-n', '10')
+    _HANDBRAKE_RUN_KWARGS = {}
+else:
+    _HANDBRAKE_PREFIX = ()
+    _HANDBRAKE_RUN_KWARGS = {}
+
 # Set a basic handler for the root logger if none exists (fallback)
 if not logging.root.handlers:
     logging.basicConfig(
@@ -56,7 +91,7 @@ def get_codec(file_path, dependency_config=None):
 
 
 def get_duration(file_path, dependency_config=None):
-    """Get the duration of a video file in seconds.
+    """Get the duration of a video file in seconds (fractional, 0 if unknown).
 
     Args:
         file_path: Path to the video file
@@ -76,61 +111,254 @@ def get_duration(file_path, dependency_config=None):
         )
         duration_str = result.stdout.strip()
         if duration_str:
-            return int(float(duration_str))
+            return float(duration_str)
         return 0
     except Exception as e:
         logger.error(f"Error getting duration for {file_path}: {e}")
         return 0
 
 
-def find_eligible_files(target_dir, min_size_bytes=None, dependency_config=None):
+def get_codec_cache_path():
+    """Get the codec cache database, kept in the user cache directory ($XDG_CACHE_HOME, default ~/.cache)."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'convert_videos' / 'codec_cache.db'
+
+
+def _open_codec_cache():
+    """Open the codec cache, creating it if needed.
+
+    Returns:
+        sqlite3.Connection, or None if the cache is disabled or can't be opened
+    """
+    if os.environ.get(CODEC_CACHE_ENV_VAR) == '0':
+        return None
+    cache_path = get_codec_cache_path()
+    connection = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(cache_path, timeout=10)
+        connection.execute('CREATE TABLE IF NOT EXISTS codec_cache '
+                           '(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, codec TEXT)')
+        return connection
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Codec cache {cache_path} is unavailable, probing all files: {repr(e)}")
+        if connection is not None:
+            connection.close()
+        return None
+
+
+def _get_cached_codecs(codec_cache, candidates):
+    """Look up candidates (size, path, mtime_ns) in the codec cache.
+
+    Returns:
+        dict: Path to codec, for the candidates whose file is unchanged since it was probed
+    """
+    codecs = {}
+    try:
+        for file_size, file_path, mtime_ns in candidates:
+            row = codec_cache.execute(
+                'SELECT codec FROM codec_cache WHERE path = ? AND mtime_ns = ? AND size = ?',
+                (os.path.abspath(file_path), mtime_ns, file_size)).fetchone()
+            if row is not None:
+                codecs[file_path] = row[0]
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read the codec cache: {repr(e)}")
+    return codecs
+
+
+def _store_cached_codecs(codec_cache, probed):
+    """Add (size, path, mtime_ns, codec) tuples to the codec cache."""
+    try:
+        with codec_cache:
+            codec_cache.executemany(
+                'INSERT OR REPLACE INTO codec_cache (path, mtime_ns, size, codec) VALUES (?, ?, ?, ?)',
+                [(os.path.abspath(file_path), mtime_ns, file_size, codec)
+                 for file_size, file_path, mtime_ns, codec in probed])
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update the codec cache: {repr(e)}")
+
+
+def _evict_cached_codecs(codec_cache, target_dir, candidates, unscanned=()):
+    """Remove cached codecs of files under target_dir that aren't among this scan's candidates.
+
+    Drops the rows of files that were deleted, renamed or fell below the size threshold.
+    Rows at or under the unscanned paths (directories or files that couldn't be read
+    during the scan) are kept, so a transient error doesn't force re-probing them.
+    """
+    root = os.path.join(os.path.abspath(target_dir), '')
+    # Every path starting with root sorts between root and root with its last
+    # character (the separator) incremented, so the primary key index is used
+    upper_bound = root[:-1] + chr(ord(root[-1]) + 1)
+    seen_paths = {os.path.abspath(file_path) for _, file_path, _ in candidates}
+    seen_paths.update(os.path.abspath(path) for path in unscanned)
+    unscanned_prefixes = tuple(os.path.join(os.path.abspath(path), '') for path in unscanned)
+    try:
+        with codec_cache:
+            cached_paths = [row[0] for row in codec_cache.execute(
+                'SELECT path FROM codec_cache WHERE path >= ? AND path < ?', (root, upper_bound))]
+            codec_cache.executemany('DELETE FROM codec_cache WHERE path = ?',
+                                    [(path,) for path in cached_paths
+                                     if path not in seen_paths and not path.startswith(unscanned_prefixes)])
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update the codec cache: {repr(e)}")
+
+
+def _iter_video_files(directory, unscanned=None):
+    """Yield os.DirEntry objects for the video files under directory, recursively.
+
+    Walks the tree once with os.scandir, matching VIDEO_EXTENSIONS
+    case-insensitively. Symlinked directories are not followed, and directories
+    that can't be read are logged and skipped. If unscanned is a list, the paths
+    of the skipped directories and entries are appended to it.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    # Extension check without splitext; a leading dot (hidden file) isn't an extension
+                    name = entry.name
+                    dot = name.rfind('.')
+                    if dot > 0 and name[dot:].lower() in VIDEO_EXTENSIONS and entry.is_file():
+                        yield entry
+                except OSError:
+                    logger.exception(f"Error processing {entry.path}")
+                    if unscanned is not None:
+                        unscanned.append(entry.path)
+    except OSError as e:
+        logger.warning(f"Could not scan {directory}: {repr(e)}")
+        if unscanned is not None:
+            unscanned.append(directory)
+        return
+    for subdir in subdirs:
+        yield from _iter_video_files(subdir, unscanned)
+
+
+def find_eligible_files(target_dir, min_size_bytes=None, dependency_config=None, use_codec_cache=True):
     """Find all video files >= min_size_bytes that are not H.265 encoded.
 
     Args:
         target_dir: Directory to scan for video files
         min_size_bytes: Minimum file size threshold in bytes (default: 1GB)
         dependency_config: Optional dict with dependency paths
+        use_codec_cache: If False, probe every file and leave the codec cache untouched
     """
-    video_extensions = ['.mp4', '.mkv', '.mov', '.avi']
     if min_size_bytes is None:
         min_size_bytes = configuration_manager.DEFAULT_MIN_FILE_SIZE_BYTES
 
-    eligible_files = []
-    target_path = Path(target_dir)
+    candidates = []
+    # Paths that couldn't be read; their cached codecs are kept
+    unscanned = []
 
     logger.info(f"Scanning directory: {target_dir}")
     logger.info(f"Minimum file size: {min_size_bytes / (1024**3):.2f} GB")
 
-    for ext in video_extensions:
-        for file_path in target_path.rglob(f'*{ext}'):
-            try:
-                # Skip files marked as failed conversions
-                # Check for .fail suffix (e.g., video.mp4.fail, video.mp4.fail_1)
-                if file_path.suffix == '.fail' or '.fail_' in file_path.name:
-                    continue
-
-                # Skip files marked as already processed originals
-                # Check for .orig.* pattern (e.g., video.orig.mp4)
-                if '.orig.' in file_path.name:
-                    continue
-
-                # Check file size
-                file_size = file_path.stat().st_size
-                if file_size < min_size_bytes:
-                    continue
-
-                # Check codec
-                codec = get_codec(file_path, dependency_config)
-                if codec != 'hevc':
-                    eligible_files.append((file_size, file_path))
-            except OSError:
-                logger.exception(f"Error processing {file_path}")
+    for entry in _iter_video_files(target_dir, unscanned):
+        # The name checks come first: they cost nothing, while the size check
+        # below needs a stat() call on Linux and macOS
+        name = entry.name
+
+        # Skip files marked as failed conversions
+        # Check for .fail suffix (e.g., video.mp4.fail, video.mp4.fail_1)
+        if name.endswith('.fail') or '.fail_' in name:
+            continue
+
+        # Skip files marked as already processed originals
+        # Check for .orig.* pattern (e.g., video.orig.mp4)
+        if '.orig.' in name:
+            continue
+
+        try:
+            # Check file size (DirEntry caches the stat result; on Windows it
+            # comes with the directory listing)
+            file_stat = entry.stat()
+        except OSError:
+            logger.exception(f"Error processing {entry.path}")
+            unscanned.append(entry.path)
+            continue
+        if file_stat.st_size < min_size_bytes:
+            continue
+
+        candidates.append((file_stat.st_size, Path(entry.path), file_stat.st_mtime_ns))
+
+    # Check codecs, probing only files that changed since they were last probed
+    codec_cache = _open_codec_cache() if use_codec_cache else None
+    try:
+        codecs = _get_cached_codecs(codec_cache, candidates) if codec_cache else {}
+        to_probe = [candidate for candidate in candidates if candidate[1] not in codecs]
+        if codecs:
+            logger.info(f"Codecs of {len(codecs)} unchanged files found in the codec cache")
+
+        # Each probe is a separate ffprobe process, so run several at once
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CODEC_PROBE_WORKERS) as executor:
+            probed = list(zip(to_probe, executor.map(
+                lambda candidate: get_codec(candidate[1], dependency_config), to_probe)))
+        for candidate, codec in probed:
+            codecs[candidate[1]] = codec
+
+        if codec_cache:
+            # Failed probes (None, or no codec reported) are retried on the next scan
+            _store_cached_codecs(codec_cache, [(*candidate, codec) for candidate, codec in probed
+                                               if codec])
+            _evict_cached_codecs(codec_cache, target_dir, candidates, unscanned)
+    finally:
+        if codec_cache:
+            codec_cache.close()
+
+    eligible_files = [candidate for candidate in candidates if codecs[candidate[1]] != 'hevc']
 
     # Sort by size (largest first)
-    eligible_files.sort(reverse=True, key=lambda x: x[0])
+    eligible_files.sort(reverse=True, key=operator.itemgetter(0))
     return [f[1] for f in eligible_files]
 
 
+@functools.lru_cache(maxsize=None)
+def detect_hevc_encoder(handbrake_path='HandBrakeCLI'):
+    """Pick the encoder used for encoder: 'auto'.
+
+    HandBrakeCLI only lists its NVENC encoders when it can use an NVIDIA GPU, so
+    its help output tells whether hardware encoding is available. Checked once
+    per HandBrakeCLI path.
+
+    Returns:
+        str: 'nvenc_hevc' if NVENC is available, otherwise 'x265_10bit'
+    """
+    try:
+        # Capture the help text in a file rather than a pipe, so run_command doesn't log it
+        with tempfile.TemporaryFile(mode='w+', errors='replace') as output:
+            subprocess_utils.run_command([handbrake_path, '--help'], check=False,
+                                         stdout=output, stderr=subprocess.STDOUT)
+            output.seek(0)
+            help_text = output.read()
+    except OSError as e:
+        logger.warning(f"Could not check {handbrake_path} for hardware encoders: {repr(e)}")
+        return 'x265_10bit'
+    if 'nvenc_h265' in help_text:
+        logger.info("NVENC is available, encoding on the GPU")
+        return 'nvenc_hevc'
+    logger.info("No hardware HEVC encoder available, encoding with x265")
+    return 'x265_10bit'
+
+
+def _claim_path(path, dry_run=False):
+    """Create path as an empty file if it doesn't exist yet.
+
+    Returns:
+        bool: True if the path was free (and is now claimed, unless dry_run)
+    """
+    if dry_run:
+        return not path.exists()
+    try:
+        with open(path, 'x'):
+            pass
+        return True
+    except FileExistsError:
+        return False
+
+
 def convert_file(input_path, dry_run=False, preserve_original=False, output_config=None, dependency_config=None, progress_callback=None, cancellation_check=None):
     """Convert a video file using HandBrakeCLI with a configurable encoder.
 
@@ -142,7 +370,7 @@ def convert_file(input_path, dry_run=False, preserve_original=False, output_conf
         input_path: Path to input video file
         dry_run: If True, only simulate conversion
         preserve_original: If True, keep original file after conversion
-        output_config: Dict with output settings (format, encoder, preset, quality)
+        output_config: Dict with output settings (format, encoder, preset, quality, hw_decoding)
         dependency_config: Dict with dependency paths (handbrake, ffprobe)
         progress_callback: Optional callback function(percentage: float) for progress updates
         cancellation_check: Optional callback function() -> bool to check if operation should be cancelled
@@ -169,20 +397,28 @@ def convert_file(input_path, dry_run=False, preserve_original=False, output_conf
     encoder_preset = output_config.get('preset', 'medium')
     quality = output_config.get('quality', 24)
 
-    # Avoid collisions with existing output or temp files
+    # Avoid collisions with existing output or temp files. The temp file is
+    # created right away (unless this is a dry run) to claim the name, so
+    # conversions running in parallel never pick the same output
     base_name = f"{input_path.stem}.converted"
-    output_path = input_path.with_name(f"{base_name}.{output_format}")
-    temp_output = output_path.with_suffix(f'.{output_format}.temp')
-
-    if output_path.exists() or temp_output.exists():
-        counter = 1
-        while True:
-            output_path = input_path.with_name(
-                f"{base_name}.{counter}.{output_format}")
-            temp_output = output_path.with_suffix(f'.{output_format}.temp')
-            if not output_path.exists() and not temp_output.exists():
+    counter = 0
+    while True:
+        name = base_name if counter == 0 else f"{base_name}.{counter}"
+        output_path = input_path.with_name(f"{name}.{output_format}")
+        temp_output = output_path.with_suffix(f'.{output_format}.temp')
+        try:
+            if not output_path.exists() and _claim_path(temp_output, dry_run):
                 break
-            counter += 1
+        except OSError as e:
+            # e.g. a read-only or full media directory
+            logger.error(f"Could not create {temp_output}: {repr(e)}")
+            return False
+        counter += 1
+
+    # A dry run doesn't need the encoder, so it skips probing HandBrakeCLI
+    if encoder_type == 'auto' and not dry_run:
+        encoder_type = detect_hevc_encoder(handbrake_path)
+        encoder_preset = configuration_manager.map_preset_for_encoder(encoder_preset, encoder_type)
 
     logger.info(f"Starting conversion: {input_path}")
     logger.info(
@@ -212,6 +448,9 @@ def convert_file(input_path, dry_run=False, preserve_original=False, output_conf
                 '--encoder-preset', encoder_preset,
                 '-q', str(quality)
             ])
+            if output_config.get('hw_decoding', False):
+                # Decode on the GPU too, instead of feeding the encoder from the CPU
+                cmd.extend(['--enable-hw-decoding', 'nvdec'])
         elif encoder_type == 'x265_10bit':
             # x265 with 10-bit color depth
             cmd.extend([
@@ -228,32 +467,13 @@ def convert_file(input_path, dry_run=False, preserve_original=False, output_conf
                 '-q', str(quality)
             ])
 
-        # Run with lower priority on Windows and Linux
-        if sys.platform == 'win32':
-            # Windows: Use BELOW_NORMAL_PRIORITY_CLASS (0x00004000)
-            BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
-            subprocess_utils.run_command(
-                cmd,
-                progress_callback=progress_callback,
-                cancellation_check=cancellation_check,
-                creationflags=BELOW_NORMAL_PRIORITY_CLASS
-            )
-        else:
-            # Linux/Unix: Try to use nice if available, otherwise run without it
-            try:
-                command_args = ['nice', '-n', '10'] + cmd
-                subprocess_utils.run_command(
-                    command_args,
-                    progress_callback=progress_callback,
-                    cancellation_check=cancellation_check
-                )
-            except FileNotFoundError:
-                # nice not available, run without it
-                subprocess_utils.run_command(
-                    cmd,
-                    progress_callback=progress_callback,
-                    cancellation_check=cancellation_check
-                )
+        # Run with lower priority (see _HANDBRAKE_PREFIX)
+        subprocess_utils.run_command(
+            [*_HANDBRAKE_PREFIX, *cmd],
+            progress_callback=progress_callback,
+            cancellation_check=cancellation_check,
+            **_HANDBRAKE_RUN_KWARGS
+        )
 
         # Validate and finalize
         return validate_and_finalize(input_path, temp_output, output_path, preserve_original, dependency_config)
@@ -267,6 +487,35 @@ def convert_file(input_path, dry_run=False, preserve_original=False, output_conf
                 logger.error(
                     f"Failed to cleanup temp file {temp_output}: {cleanup_error}")
         return False
+    except BaseException:
+        # Don't leave the claimed (or partially written) temp file behind
+        try:
+            temp_output.unlink(missing_ok=True)
+        except OSError as cleanup_error:
+            logger.error(
+                f"Failed to cleanup temp file {temp_output}: {cleanup_error}")
+        raise
+
+
+def _drop_from_page_cache(path):
+    """Ask the kernel to evict path's cached pages, where supported (Linux).
+
+    A conversion streams gigabytes through the page cache that won't be read
+    again; dropping them keeps other programs' cached data from being evicted.
+    Only clean pages are dropped; errors are ignored since this is just a hint.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def validate_and_finalize(input_path, temp_output, final_output, preserve_original=False, dependency_config=None):
@@ -282,6 +531,11 @@ def validate_and_finalize(input_path, temp_output, final_output, preserve_origin
     src_duration = get_duration(input_path, dependency_config)
     out_duration = get_duration(temp_output, dependency_config)
 
+    # Neither file is read again; the cache follows the inode, so this holds
+    # whatever they are renamed to below
+    _drop_from_page_cache(input_path)
+    _drop_from_page_cache(temp_output)
+
     if src_duration == 0 or out_duration == 0:
         logger.error(
             f"❌ Could not determine duration: src={src_duration} vs out={out_duration}")
@@ -294,7 +548,7 @@ def validate_and_finalize(input_path, temp_output, final_output, preserve_origin
         return False
 
     diff = abs(src_duration - out_duration)
-    if diff <= 1:
+    if diff <= DURATION_TOLERANCE_SECONDS:
         # Success - move temp to final and optionally remove/rename original
         temp_output.rename(final_output)
         if not preserve_original:
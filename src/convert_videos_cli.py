@@ -8,6 +8,8 @@ import sys
 import convert_videos
 
 import argparse
+import concurrent.futures
+import functools
 import logging
 import logging.handlers
 import os
@@ -21,6 +23,9 @@ import logging_utils
 
 logger = logging.getLogger(__name__)
 
+# Time between the starts of consecutive scans in --loop mode
+LOOP_SCAN_INTERVAL_SECONDS = 3600
+
 
 def main():
     """Main entry point for the script."""
@@ -46,6 +51,12 @@ Examples:
     parser.add_argument('--loop',
                         action='store_true',
                         help='Run continuously, checking every hour')
+    parser.add_argument('--jobs',
+                        type=int,
+                        help='Number of files to convert in parallel (default: 1)')
+    parser.add_argument('--no-codec-cache',
+                        action='store_true',
+                        help='Probe every file on each scan instead of reusing cached codecs')
     parser.add_argument('--remove-original-files',
                         action='store_true',
                         help='Remove original files after successful conversion (default: keep originals)')
@@ -94,6 +105,8 @@ Examples:
 
     min_file_size = config['min_file_size']
 
+    jobs = config.get('jobs', 1)
+
     output_config = config['output']
 
     # Auto-download dependencies if requested
@@ -125,10 +138,12 @@ Examples:
 
     # Main processing loop
     while True:
+        scan_started = time.monotonic()
         logger.info(f"Starting scan in {target_directory}")
 
         files = convert_videos.find_eligible_files(
-            target_directory, min_file_size, dependency_config)
+            target_directory, min_file_size, dependency_config,
+            use_codec_cache=not args.no_codec_cache)
 
         if not files:
             logger.info("No eligible files found.")
@@ -137,15 +152,31 @@ Examples:
             for file in files:
                 logger.info(f"  {file}")
 
-            for file in files:
-                convert_videos.convert_file(file, dry_run=dry_run, preserve_original=preserve_original,
-                                            output_config=output_config, dependency_config=dependency_config)
+            convert = functools.partial(convert_videos.convert_file, dry_run=dry_run,
+                                        preserve_original=preserve_original, output_config=output_config,
+                                        dependency_config=dependency_config)
+            # Largest files are started first; with one job they run one after another as before
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(convert, files))
+
+            failed = [file for file, success in zip(files, results) if not success]
+            if dry_run:
+                # Nothing was converted, convert_file only reported what it would do
+                logger.info(f"[Dry Run] Would convert {len(files) - len(failed)} files")
+            else:
+                logger.info(f"Converted {len(files) - len(failed)} of {len(files)} files")
+            for file in failed:
+                logger.warning(f"  Failed: {file}")
 
         if not loop_mode:
             break
 
-        logger.info("Waiting 1 hour before next scan...")
-        time.sleep(3600)
+        # Time spent converting counts towards the interval, so the next scan
+        # starts right away if the conversions took longer than that
+        wait_seconds = LOOP_SCAN_INTERVAL_SECONDS - (time.monotonic() - scan_started)
+        if wait_seconds > 0:
+            logger.info(f"Waiting {wait_seconds / 60:.0f} minutes before next scan...")
+            time.sleep(wait_seconds)
 
 
 if __name__ == '__main__':
@@ -676,7 +676,9 @@ class VideoConverterGUI:
                 'format': self.format_var.get(),
                 'encoder': self.encoder_var.get(),
                 'preset': self.preset_var.get(),
-                'quality': self._parse_quality()
+                'quality': self._parse_quality(),
+                # Not editable in the GUI; keep the configured value
+                'hw_decoding': self.config.get('output', {}).get('hw_decoding', False)
             },
             'dependencies': {
                 'handbrake': self.handbrake_entry.get().strip(),
@@ -685,7 +687,9 @@ class VideoConverterGUI:
             },
             'remove_original_files': self.remove_original_var.get(),
             'dry_run': self.dry_run_var.get(),
-            'loop': False  # GUI mode doesn't use loop
+            'loop': False,  # GUI mode doesn't use loop
+            # Not editable in the GUI; keep the configured value
+            'jobs': self.config.get('jobs', 1)
         }
         return config
 
@@ -913,7 +917,8 @@ class VideoConverterGUI:
                 'format': self.format_var.get(),
                 'encoder': self.encoder_var.get(),
                 'preset': self.preset_var.get(),
-                'quality': int(self.quality_entry.get().strip())
+                'quality': int(self.quality_entry.get().strip()),
+                'hw_decoding': self.config.get('output', {}).get('hw_decoding', False)
             }
             remove_original = self.remove_original_var.get()
             # Convert to preserve_original for backward compatibility with convert_file function
@@ -2,26 +2,93 @@
 """
 Download dependencies
 """
+import concurrent.futures
+import errno
+import hashlib
 import logging
 import os
 import platform
+import queue
+import shlex
 import shutil
 import subprocess
 import sys
 import tarfile
-import urllib.request
+import threading
 import zipfile
 from pathlib import Path
 import tempfile
 
+import urllib3
+
 import subprocess_utils
 
 # Version constants for external tools
 HANDBRAKE_VERSION = '1.7.2'
 FFMPEG_VERSION = '6.1'
 
+# Copy buffer for streaming downloads (shutil's default is only 64 KiB)
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+# Read/copy buffer for archive extraction (tarfile copies members in 16 KiB chunks by default)
+EXTRACT_BUFFER_SIZE = 1024 * 1024
+
+# Number of DOWNLOAD_BUFFER_SIZE chunks read ahead of extraction when extracting while downloading
+DOWNLOAD_PREFETCH_CHUNKS = 8
+
+# Builds cache downloaded archives under <download dir>/cache/<sha256(url)>/ so repeat
+# builds don't fetch them again. Set CONVERT_VIDEOS_BUILD_CACHE=0 to disable.
+DOWNLOAD_CACHE_DIR_NAME = 'cache'
+DOWNLOAD_CACHE_ENV_VAR = 'CONVERT_VIDEOS_BUILD_CACHE'
+# Cached archives not used by the latest download (e.g. superseded versions) are
+# removed to bound disk usage. Set CONVERT_VIDEOS_KEEP_DOWNLOADS=1 to keep them.
+KEEP_DOWNLOADS_ENV_VAR = 'CONVERT_VIDEOS_KEEP_DOWNLOADS'
+# Names of the cache entries used since download_dependencies started. Tracked by
+# name rather than by modification time, which is coarse on FAT and some network mounts.
+_used_cache_entries = set()
+_used_cache_entries_lock = threading.Lock()
+
+# PEP 706 extraction filter (Python 3.12+, backported to 3.11.4+): additionally rejects
+# links pointing outside the destination, device files and setuid bits
+TAR_EXTRACT_FILTER = 'data' if hasattr(tarfile, 'data_filter') else None
+# Raised by that filter; catching () matches nothing on Pythons without it
+_TAR_FILTER_ERROR = getattr(tarfile, 'FilterError', ())
+
+# Archive formats that can be extracted while they are still downloading
+TAR_ARCHIVE_EXTENSIONS = ('.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Known location (glob pattern relative to the extraction directory) of each binary
+# inside the downloaded archives, so it can be found without walking the whole tree
+ARCHIVE_BINARY_LAYOUTS = {
+    'windows': {
+        'HandBrakeCLI.exe': 'HandBrakeCLI.exe',
+        'ffmpeg.exe': 'ffmpeg-*/bin/ffmpeg.exe',
+        'ffprobe.exe': 'ffmpeg-*/bin/ffprobe.exe',
+    },
+    'macos': {
+        'HandBrakeCLI': 'HandBrakeCLI',
+        'ffmpeg': 'ffmpeg',
+        'ffprobe': 'ffprobe',
+    },
+    'linux': {
+        'ffmpeg': 'ffmpeg-*-static/ffmpeg',
+        'ffprobe': 'ffmpeg-*-static/ffprobe',
+    },
+}
+
 logger = logging.getLogger(__name__)
 
+# Shared HTTP connection pool for all dependency downloads. Connection errors and
+# gateway errors are retried with exponential backoff; stalled reads time out.
+_HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=8,
+    timeout=urllib3.Timeout(connect=30, read=60),
+    retries=urllib3.Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504)))
+
+# How many times an interrupted download is resumed (with an HTTP Range request)
+DOWNLOAD_RESUME_ATTEMPTS = 3
+
+
 def get_platform():
     """Detect the current platform."""
     system = platform.system().lower()
@@ -141,12 +208,9 @@ def validate_dependencies(dependency_paths=None):
         'ffmpeg': dependency_paths.get('ffmpeg', 'ffmpeg'),
         'HandBrakeCLI': dependency_paths.get('handbrake', 'HandBrakeCLI')
     }
-    missing = []
-
-    for name, path in dependencies.items():
-        is_valid, _ = check_single_dependency(path)
-        if not is_valid:
-            missing.append(f"{name} (path: {path})")
+    results = check_dependencies(dependencies.values())
+    missing = [f"{name} (path: {path})"
+               for (name, path), (is_valid, _) in zip(dependencies.items(), results) if not is_valid]
 
     if missing:
         logger.error(f"Missing dependencies: {', '.join(missing)}")
@@ -156,6 +220,20 @@ def validate_dependencies(dependency_paths=None):
     return not missing
 
 
+def check_dependencies(commands):
+    """Run check_single_dependency on several commands concurrently.
+
+    Each check starts the tool to ask for its version, which takes a moment for
+    HandBrakeCLI and ffmpeg, so they are run at the same time.
+
+    Returns:
+        list: check_single_dependency's (success, error_message) for each command, in order
+    """
+    commands = list(commands)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(commands), 1)) as executor:
+        return list(executor.map(check_single_dependency, commands))
+
+
 def check_single_dependency(command):
     """Check if a single dependency command is available.
 
@@ -189,63 +267,411 @@ def check_single_dependency(command):
     return False, "invalid"
 
 
-def download_file(url, dest_path):
-    """Download a file from a URL to dest_path."""
+class _TeeReader:
+    """File-like reader that copies everything read from source into sink."""
+
+    def __init__(self, source, sink):
+        self._source = source
+        self._sink = sink
+
+    def read(self, size=-1):
+        data = self._source.read(size)
+        self._sink.write(data)
+        return data
+
+
+class _PrefetchReader:
+    """File-like reader that reads source ahead on a background thread.
+
+    Up to max_chunks chunks are buffered, so the network keeps being read while
+    the consumer is busy (e.g. decompressing). Use as a context manager so the
+    background thread is stopped if the consumer gives up early.
+    """
+
+    def __init__(self, source, chunk_size=DOWNLOAD_BUFFER_SIZE, max_chunks=DOWNLOAD_PREFETCH_CHUNKS):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._pending = b''
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, args=(source, chunk_size), daemon=True)
+        self._thread.start()
+
+    def _produce(self, source, chunk_size):
+        try:
+            while not self._stop.is_set():
+                chunk = source.read(chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read(self, size=-1):
+        if not self._pending and not self._eof:
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            self._pending = item
+            self._eof = not item
+        if size is None or size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a copy across filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _get_cached_download_path(url, cache_dir):
+    """Get the cache location for url, or None if caching is disabled."""
+    if cache_dir is None or os.environ.get(DOWNLOAD_CACHE_ENV_VAR, '1') == '0':
+        return None
+    url_key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return Path(cache_dir) / url_key / url.split('/')[-1]
+
+
+def _get_etag_path(cached_path):
+    """Get the sidecar file that records the ETag a cached download was served with."""
+    return cached_path.with_name(f'{cached_path.name}.etag')
+
+
+def _write_cached_etag(cached_path, etag):
+    """Record (or clear) the ETag of a cached download."""
+    etag_path = _get_etag_path(cached_path)
+    try:
+        if etag:
+            etag_path.write_text(etag, encoding='utf-8')
+        else:
+            etag_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not record ETag for {cached_path}: {repr(e)}")
+
+
+def _is_cached_download_valid(url, cached_path):
+    """Check whether a cached download exists and matches the server's copy.
+
+    The cached copy must match the server's Content-Length and, if both are
+    known, the ETag it was downloaded with. If the server can't be reached the
+    cached copy is trusted, so builds keep working offline.
+    """
+    if cached_path is None or not cached_path.is_file():
+        return False
+    try:
+        response = _HTTP.request('HEAD', url)
+    except urllib3.exceptions.HTTPError as e:
+        logger.info(f"Could not check {url} for updates ({repr(e)}), using cached copy")
+        return True
+
+    content_length = response.headers.get('Content-Length')
+    if response.status == 200 and content_length is not None \
+            and int(content_length) != cached_path.stat().st_size:
+        logger.info(f"Cached copy of {url} is outdated")
+        return False
+
+    etag = response.headers.get('ETag')
+    etag_path = _get_etag_path(cached_path)
+    if response.status == 200 and etag and etag_path.is_file() \
+            and etag_path.read_text(encoding='utf-8') != etag:
+        logger.info(f"Cached copy of {url} is outdated (ETag changed)")
+        return False
+    return True
+
+
+def _store_in_cache(src_path, cached_path, etag=None):
+    """Atomically place src_path at cached_path in the download cache."""
+    try:
+        cached_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cached_path.with_name(f'{cached_path.name}.tmp')
+        tmp_path.unlink(missing_ok=True)
+        _link_or_copy(src_path, tmp_path)
+        os.replace(tmp_path, cached_path)
+        _write_cached_etag(cached_path, etag)
+        _mark_cache_entry_used(cached_path)
+    except OSError as e:
+        logger.warning(f"Could not cache {src_path}: {repr(e)}")
+
+
+def _mark_cache_entry_used(cached_path):
+    """Record that the cache entry holding cached_path was used, so pruning keeps it."""
+    with _used_cache_entries_lock:
+        _used_cache_entries.add(cached_path.parent.name)
+
+
+def _prune_download_cache(cache_dir, used_entries):
+    """Remove the entries of cache_dir whose names are not in used_entries."""
+    if os.environ.get(KEEP_DOWNLOADS_ENV_VAR) == '1' or not cache_dir.is_dir():
+        return
+    for entry in cache_dir.iterdir():
+        try:
+            if entry.name not in used_entries:
+                logger.info(f"Removing unused cached download: {entry}")
+                if entry.is_dir():
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    entry.unlink()
+        except OSError as e:
+            logger.warning(f"Could not remove cached download {entry}: {repr(e)}")
+
+
+def _check_free_space(path, response):
+    """Fail up front if the response body won't fit next to path.
+
+    Raises:
+        OSError: With errno ENOSPC if the announced Content-Length exceeds the
+                 free space, instead of running out partway through the download
+    """
+    content_length = response.headers.get('Content-Length')
+    if content_length is None:
+        return
+    free = shutil.disk_usage(os.path.dirname(os.path.abspath(path))).free
+    if int(content_length) > free:
+        raise OSError(errno.ENOSPC, f"Not enough disk space to download {content_length} bytes "
+                                    f"({free} bytes free)", str(path))
+
+
+def download_file(url, dest_path, cache_dir=None):
+    """Download a file from a URL to dest_path.
+
+    Uses the shared connection pool, so downloads from the same host reuse the
+    existing TCP/TLS connection instead of handshaking again.
+
+    Args:
+        url: URL to download
+        dest_path: Path to write the file to
+        cache_dir: Optional persistent cache directory. A valid cached copy is
+                   used instead of downloading, and new downloads are added to it.
+    """
+    cached_path = _get_cached_download_path(url, cache_dir)
+    if _is_cached_download_valid(url, cached_path):
+        _link_or_copy(cached_path, dest_path)
+        _mark_cache_entry_used(cached_path)
+        logger.info(f"Using cached download of {url}: {cached_path}")
+        return True
+
     logger.info(f"Downloading {url}...")
+    # Download to a .part file so an interrupted download never looks complete
+    part_path = f'{dest_path}.part'
     try:
-        with urllib.request.urlopen(url) as response:
-            with open(dest_path, 'wb') as out_file:
-                shutil.copyfileobj(response, out_file)
+        etag = None
+        with open(part_path, 'wb') as out_file:
+            for attempt in range(DOWNLOAD_RESUME_ATTEMPTS + 1):
+                request_kwargs = {}
+                offset = out_file.tell()
+                if offset:
+                    # Resume where the interrupted attempt stopped, unless the file changed
+                    request_kwargs['headers'] = {'Range': f'bytes={offset}-', **({'If-Range': etag} if etag else {})}
+                response = _HTTP.request('GET', url, preload_content=False, **request_kwargs)
+                try:
+                    if response.status == 200 and offset:
+                        # The server sent the whole file, start over
+                        out_file.seek(0)
+                        out_file.truncate()
+                    elif response.status != 200 and not (response.status == 206 and offset):
+                        raise urllib3.exceptions.HTTPError(f"HTTP {response.status} {response.reason}")
+                    if response.status == 200:
+                        etag = response.headers.get('ETag')
+                    _check_free_space(part_path, response)
+                    shutil.copyfileobj(response, out_file, DOWNLOAD_BUFFER_SIZE)
+                    break
+                except (urllib3.exceptions.ProtocolError, urllib3.exceptions.ReadTimeoutError) as e:
+                    if attempt == DOWNLOAD_RESUME_ATTEMPTS:
+                        raise
+                    logger.warning(f"Download of {url} interrupted after {out_file.tell()} bytes "
+                                   f"({repr(e)}), resuming...")
+                finally:
+                    response.release_conn()
+
+        os.replace(part_path, dest_path)
         logger.info(f"Downloaded to {dest_path}")
-        return True
-    except (urllib.error.URLError, OSError, IOError) as e:
+    except (urllib3.exceptions.HTTPError, OSError, IOError) as e:
         logger.error(f"Error downloading {url}: {repr(e)}")
+        try:
+            os.unlink(part_path)
+        except OSError:
+            pass
         return False
 
+    if cached_path:
+        _store_in_cache(dest_path, cached_path, etag)
+    return True
+
+
+def download_and_extract_tar(url, extract_to, cache_dir=None, member_names=None):
+    """Download a tar archive and extract it while it streams in.
+
+    The archive is decompressed and extracted directly from the HTTP response,
+    so extraction overlaps the download. The archive is only written to disk
+    when cache_dir is given, in which case a valid cached copy is extracted
+    instead of downloading. member_names limits extraction as in extract_archive.
+
+    Returns:
+        bool: True on success, False if the download or extraction failed
+    """
+    cached_path = _get_cached_download_path(url, cache_dir)
+    if _is_cached_download_valid(url, cached_path):
+        logger.info(f"Using cached download of {url}: {cached_path}")
+        try:
+            extract_archive(cached_path, extract_to, member_names)
+            _mark_cache_entry_used(cached_path)
+            return True
+        except (ValueError, RuntimeError, tarfile.TarError, OSError) as e:
+            logger.warning(f"Failed to extract cached {cached_path}, downloading again: {repr(e)}")
+
+    logger.info(f"Downloading and extracting {url}...")
+    cache_file = None
+    # Extract next to extract_to and move the files into place only once the whole
+    # archive has been downloaded, so a failure partway through leaves nothing behind
+    staging_dir = None
+    try:
+        staging_dir = tempfile.mkdtemp(prefix='.extract_', dir=os.path.dirname(os.path.abspath(extract_to)))
+        response = _HTTP.request('GET', url, preload_content=False)
+        try:
+            if response.status != 200:
+                raise urllib3.exceptions.HTTPError(f"HTTP {response.status} {response.reason}")
+            etag = response.headers.get('ETag')
+            source = response
+            if cached_path:
+                cached_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_file = open(cached_path.with_name(f'{cached_path.name}.tmp'), 'wb')
+                source = _TeeReader(response, cache_file)
+            # The cache file is written on the prefetch thread, alongside the download
+            with _PrefetchReader(source) as reader:
+                with tarfile.open(fileobj=reader, mode='r|*', bufsize=EXTRACT_BUFFER_SIZE) as tar:
+                    _safe_extract_tar(tar, staging_dir, member_names)
+                if cache_file:
+                    # tarfile stops at the end-of-archive marker; keep the full file in the cache
+                    while reader.read(DOWNLOAD_BUFFER_SIZE):
+                        pass
+        finally:
+            response.release_conn()
+
+        _move_tree(staging_dir, extract_to)
+        if cache_file:
+            cache_file.close()
+            os.replace(cache_file.name, cached_path)
+            _write_cached_etag(cached_path, etag)
+            _mark_cache_entry_used(cached_path)
+        logger.info(f"Extracted to {extract_to}")
+        return True
+    except (urllib3.exceptions.HTTPError, tarfile.TarError, RuntimeError, OSError, IOError) as e:
+        logger.error(f"Error downloading and extracting {url}: {repr(e)}")
+        return False
+    finally:
+        if cache_file and not cache_file.closed:
+            cache_file.close()
+            try:
+                os.unlink(cache_file.name)
+            except OSError:
+                pass
+        if staging_dir:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _move_tree(src_dir, dst_dir):
+    """Move the contents of src_dir into dst_dir, merging into existing directories."""
+    os.makedirs(dst_dir, exist_ok=True)
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            target = os.path.join(dst_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False) and os.path.isdir(target):
+                _move_tree(entry.path, target)
+            else:
+                os.replace(entry.path, target)
+
 
 def _is_within_directory(directory, target):
     """
     Return True if the target path is inside the given directory.
     Prevents path traversal when extracting archives.
     """
-    abs_directory = os.path.abspath(directory)
+    return _is_within_abs_directory(os.path.abspath(directory), target)
+
+
+def _is_within_abs_directory(abs_directory, target):
+    """Like _is_within_directory, for a directory already made absolute with os.path.abspath.
+
+    Lets extraction loops normalize the destination once instead of per member.
+    """
+    # abspath also normalizes, so '..' components are already resolved
     abs_target = os.path.abspath(target)
+    # The trailing separator keeps '/dir' from matching '/dir2'; paths on
+    # another drive (Windows) never match
+    return abs_target == abs_directory or abs_target.startswith(os.path.join(abs_directory, ''))
 
-    # Ensure both paths are normalized
-    abs_directory = os.path.normpath(abs_directory)
-    abs_target = os.path.normpath(abs_target)
 
-    # Use commonpath to check if both paths share the same prefix
-    try:
-        prefix = os.path.commonpath([abs_directory, abs_target])
-        # Target is within directory if commonpath equals directory
-        # This handles both subdirectories and the directory itself
-        return prefix == abs_directory
-    except ValueError:
-        # Paths are on different drives (Windows) or one is relative
-        return False
+def _safe_extract_tar(tar, extract_to, member_names=None):
+    """Safely extract members from a tarfile into extract_to.
 
+    Members are validated and extracted in a single pass, so this also works on
+    tarfiles opened in streaming mode (e.g. directly over an HTTP response).
 
-def _safe_extract_tar(tar, extract_to):
-    """Safely extract members from a tarfile into extract_to."""
-    for member in tar.getmembers():
+    Args:
+        member_names: Optional set of file names; if given, only members with one
+                      of these base names are extracted
+    """
+    abs_extract_to = os.path.abspath(extract_to)
+    for member in tar:
+        if member_names is not None and os.path.basename(member.name) not in member_names:
+            continue
         member_path = os.path.join(extract_to, member.name)
-        if not _is_within_directory(extract_to, member_path):
+        if not _is_within_abs_directory(abs_extract_to, member_path):
             raise RuntimeError(f"Attempted path traversal in tar archive: {member.name}")
         else:
             logger.info(f'Extracting: {member_path}')
-    tar.extractall(extract_to)
+        # Like extractall, don't apply directory attributes (e.g. read-only modes)
+        # before the directory's contents are extracted
+        extract_kwargs = {'filter': TAR_EXTRACT_FILTER} if TAR_EXTRACT_FILTER else {}
+        try:
+            tar.extract(member, extract_to, set_attrs=not member.isdir(), **extract_kwargs)
+        except _TAR_FILTER_ERROR as e:
+            raise RuntimeError(f"Unsafe member in tar archive: {member.name} ({repr(e)})") from e
 
 
-def _safe_extract_zip(zip_ref, extract_to):
-    """Safely extract members from a zipfile into extract_to."""
-    for member in zip_ref.infolist():
-        member_path = os.path.join(extract_to, member.filename)
-        if not _is_within_directory(extract_to, member_path):
-            raise RuntimeError(f"Attempted path traversal in zip archive: {member.filename}")
-        else:
+def _safe_extract_zip(zip_ref, extract_to, member_names=None):
+    """Safely extract members from a zipfile into extract_to.
+
+    Args:
+        member_names: Optional set of file names; if given, only members with one
+                      of these base names are extracted (the rest are never inflated)
+    """
+    abs_extract_to = os.path.abspath(extract_to)
+
+    def validated_members():
+        # Each member is checked right before extractall writes it
+        for member in zip_ref.infolist():
+            if member_names is not None and os.path.basename(member.filename) not in member_names:
+                continue
+            member_path = os.path.join(extract_to, member.filename)
+            if not _is_within_abs_directory(abs_extract_to, member_path):
+                raise RuntimeError(f"Attempted path traversal in zip archive: {member.filename}")
             logger.info(f'Extracting: {member_path}')
-    zip_ref.extractall(extract_to)
+            yield member
+
+    zip_ref.extractall(extract_to, members=validated_members())
 
 
 def _safe_extract_dmg(mount_point, extract_to):
@@ -365,37 +791,158 @@ def extract_dmg(dmg_path, extract_to):
                 logger.debug(f"Could not remove temporary mount directory {mount_point}: {e}")
 
 
-def extract_archive(archive_path, extract_to):
+def _extract_tar_xz_with_system_tar(archive_path, extract_to, member_names=None):
+    """Extract a .tar.xz with the system (GNU) tar, decompressing with multithreaded xz.
+
+    Native tar/xz is considerably faster than tarfile's pure-Python extraction.
+    GNU tar refuses absolute and '..' member paths by default. Only used on
+    Linux, since the member selection options are GNU-specific.
+
+    Returns:
+        bool: True if extracted, False if tar or xz isn't available
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    tar_path = shutil.which('tar')
+    xz_path = shutil.which('xz')
+    if not tar_path or not xz_path:
+        return False
+
+    # tar splits the program string into words, so quote the path in case it has spaces
+    command_args = [tar_path, '--use-compress-program', f'{shlex.quote(xz_path)} -T0', '--no-same-owner',
+                    '-xf', str(archive_path), '-C', str(extract_to)]
+    if member_names is not None:
+        # Match the names as the last path component of any member
+        command_args += ['--wildcards', '--no-anchored', *sorted(member_names)]
+
+    # Unlike tarfile, tar doesn't create the destination directory
+    os.makedirs(extract_to, exist_ok=True)
+    logger.info(f"Extracting {archive_path} with {tar_path}")
+    result = subprocess.run(
+        command_args,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to extract {archive_path}: {result.stderr}")
+    return True
+
+
+def _extract_tar_file(archive_path, extract_to, member_names=None):
+    if archive_path.lower().endswith(('.tar.xz', '.txz')) \
+            and _extract_tar_xz_with_system_tar(archive_path, extract_to, member_names):
+        return
+    with open(archive_path, 'rb', buffering=EXTRACT_BUFFER_SIZE) as archive_file, \
+            tarfile.open(fileobj=archive_file, mode='r:*', copybufsize=EXTRACT_BUFFER_SIZE) as tar:
+        _safe_extract_tar(tar, extract_to, member_names)
+
+
+def _extract_zip_file(archive_path, extract_to, member_names=None):
+    with open(archive_path, 'rb', buffering=EXTRACT_BUFFER_SIZE) as archive_file, \
+            zipfile.ZipFile(archive_file, 'r') as zip_ref:
+        _safe_extract_zip(zip_ref, extract_to, member_names)
+
+
+def _extract_dmg_file(archive_path, extract_to, member_names=None):
+    # extract_dmg() handles mounting and extracting the entire archive
+    extract_dmg(archive_path, extract_to)
+
+
+def _reject_flatpak(archive_path, extract_to, member_names=None):
+    # Flatpak files require the flatpak runtime and cannot be extracted as simple archives
+    raise ValueError(f"Flatpak files are not supported for extraction. Please install HandBrakeCLI via system package manager.")
+
+
+# Archive suffixes (matched case-insensitively) and the function that extracts them
+ARCHIVE_EXTRACTORS = (
+    (TAR_ARCHIVE_EXTENSIONS, _extract_tar_file),
+    (('.zip',), _extract_zip_file),
+    (('.dmg',), _extract_dmg_file),
+    (('.flatpak',), _reject_flatpak),
+)
+
+
+def extract_archive(archive_path, extract_to, member_names=None):
     """Extract tar.gz, zip, dmg, or other archive safely.
 
-    Extracts all contents to extract_to directory with path traversal validation.
+    Extracts the contents to extract_to directory with path traversal validation.
+
+    Args:
+        archive_path: Archive to extract
+        extract_to: Directory to extract to
+        member_names: Optional set of file names; if given, only members with one
+                      of these base names are extracted (DMGs are always extracted whole)
     """
 
     archive_path = str(archive_path)
+    archive_suffix_path = archive_path.lower()
 
-    logger.info(f"Extracting {archive_path}...")
-    if archive_path.endswith('.tar.gz') or archive_path.endswith('.tar.bz2') or archive_path.endswith('.tar.xz'):
-        with tarfile.open(archive_path, 'r:*') as tar:
-            _safe_extract_tar(tar, extract_to)
-    elif archive_path.endswith('.zip'):
-        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-            _safe_extract_zip(zip_ref, extract_to)
-    elif archive_path.endswith('.dmg'):
-        # DMG extraction uses extract_dmg() which handles mounting and extracting entire archive
-        extract_dmg(archive_path, extract_to)
-        return
-    elif archive_path.endswith('.flatpak'):
-        # Flatpak files require the flatpak runtime and cannot be extracted as simple archives
-        raise ValueError(f"Flatpak files are not supported for extraction. Please install HandBrakeCLI via system package manager.")
+    for suffixes, extractor in ARCHIVE_EXTRACTORS:
+        if archive_suffix_path.endswith(suffixes):
+            break
     else:
         raise ValueError(f"Unsupported archive format: {archive_path}")
 
+    logger.info(f"Extracting {archive_path}...")
+    extractor(archive_path, extract_to, member_names)
     logger.info(f"Extracted to {extract_to}")
 
 
-def download_handbrake(tmpdir, download_dir):
+def _find_extracted_binary(extract_dir, binary_name, platform_name):
+    """Locate a binary inside an extracted archive.
+
+    Checks the known archive layout first and only falls back to a recursive
+    search (stopping at the first match) if the layout has changed.
+
+    Args:
+        extract_dir: Directory the archive was extracted to
+        binary_name: File name of the binary (e.g., 'ffmpeg.exe')
+        platform_name: Platform the archive was downloaded for
+
+    Returns:
+        Path to the binary, or None if it was not found
+    """
+    extract_dir = Path(extract_dir)
+
+    layout_pattern = ARCHIVE_BINARY_LAYOUTS.get(platform_name, {}).get(binary_name)
+    if layout_pattern:
+        for candidate in extract_dir.glob(layout_pattern):
+            if candidate.is_file():
+                return candidate
+
+    logger.debug(f"{binary_name} not at its known location in {extract_dir}, searching...")
+    return _scan_for_file(extract_dir, binary_name)
+
+
+def _scan_for_file(directory, file_name):
+    """Depth-first search of directory for a file named file_name.
+
+    Uses os.scandir so file types come from the directory listing rather than a
+    stat() per entry, and stops at the first match. Symlinked directories are
+    not followed.
+
+    Returns:
+        Path to the file, or None if it was not found
+    """
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name == file_name and entry.is_file():
+                return Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    for subdir in subdirs:
+        found = _scan_for_file(subdir, file_name)
+        if found:
+            return found
+    return None
+
+
+def download_handbrake(tmpdir, download_dir, cache_dir=None):
     """Download HandBrakeCLI for the specified platform.
 
+    cache_dir is an optional persistent download cache (see download_file).
+
     Note:
     - Windows: Downloads and extracts ZIP archive
     - macOS: Downloads DMG and extracts entire archive, then locates CLI binary
@@ -413,27 +960,27 @@ def download_handbrake(tmpdir, download_dir):
         archive_name = url.split('/')[-1]
         archive_path = handbrake_dir / archive_name
 
-        if not download_file(url, archive_path):
+        if not download_file(url, archive_path, cache_dir):
             return None
 
         try:
-            extract_archive(archive_path, handbrake_dir)
+            extract_archive(archive_path, handbrake_dir, member_names={'HandBrakeCLI.exe'})
         except (ValueError, RuntimeError) as e:
             logger.error(f"Failed to extract archive: {repr(e)}")
             return None
 
         # Find HandBrakeCLI.exe in extracted files
-        for root, dirs, files in os.walk(handbrake_dir):
-            if 'HandBrakeCLI.exe' in files:
-                shutil.copy(Path(root) / 'HandBrakeCLI.exe', download_dir / 'HandBrakeCLI.exe')
-                return download_dir / 'HandBrakeCLI.exe'
+        handbrake_bin = _find_extracted_binary(handbrake_dir, 'HandBrakeCLI.exe', platform_name)
+        if handbrake_bin:
+            shutil.copy(handbrake_bin, download_dir / 'HandBrakeCLI.exe')
+            return download_dir / 'HandBrakeCLI.exe'
 
     elif platform_name == 'macos':
         url = f"https://github.com/HandBrake/HandBrake/releases/download/{HANDBRAKE_VERSION}/HandBrakeCLI-{HANDBRAKE_VERSION}.dmg"
         archive_name = url.split('/')[-1]
         archive_path = handbrake_dir / archive_name
 
-        if not download_file(url, archive_path):
+        if not download_file(url, archive_path, cache_dir):
             return None
 
         try:
@@ -444,10 +991,10 @@ def download_handbrake(tmpdir, download_dir):
             return None
 
         # Find HandBrakeCLI in extracted files
-        for root, dirs, files in os.walk(handbrake_dir):
-            if 'HandBrakeCLI' in files:
-                shutil.copy(Path(root) / 'HandBrakeCLI', download_dir / 'HandBrakeCLI')
-                return download_dir / 'HandBrakeCLI'
+        handbrake_bin = _find_extracted_binary(handbrake_dir, 'HandBrakeCLI', platform_name)
+        if handbrake_bin:
+            shutil.copy(handbrake_bin, download_dir / 'HandBrakeCLI')
+            return download_dir / 'HandBrakeCLI'
 
     elif platform_name == 'linux':
         # Linux: HandBrake CLI is not available as a simple download
@@ -473,8 +1020,58 @@ def download_handbrake(tmpdir, download_dir):
     return None
 
 
-def download_ffmpeg(tmpdir, download_dir):
-    """Download ffmpeg/ffprobe for the specified platform."""
+def _copy_system_ffmpeg(download_dir):
+    """Copy system-installed ffmpeg/ffprobe to download_dir for bundling.
+
+    Returns:
+        tuple: (ffmpeg_bin, ffprobe_bin), or (None, None) if they are not installed
+    """
+    system_ffmpeg = shutil.which('ffmpeg')
+    system_ffprobe = shutil.which('ffprobe')
+
+    if system_ffmpeg and system_ffprobe:
+        ffmpeg_bin = download_dir / 'ffmpeg'
+        ffprobe_bin = download_dir / 'ffprobe'
+        shutil.copy2(system_ffmpeg, ffmpeg_bin)
+        shutil.copy2(system_ffprobe, ffprobe_bin)
+        logger.info(f"Using system ffmpeg from: {system_ffmpeg}")
+        logger.info(f"Using system ffprobe from: {system_ffprobe}")
+        return ffmpeg_bin, ffprobe_bin
+
+    logger.warning("ffmpeg/ffprobe not found. Please install via: sudo apt-get install ffmpeg")
+    return None, None
+
+
+def _download_macos_ffmpeg_binary(binary_name, url, ffmpeg_dir, download_dir, cache_dir):
+    """Download and extract a single macOS ffmpeg/ffprobe zip into download_dir.
+
+    Returns:
+        Path to the binary in download_dir, or None on failure
+    """
+    archive_path = ffmpeg_dir / f'{binary_name}.zip'
+    extract_dir = ffmpeg_dir / f'{binary_name}_extract'
+
+    if not download_file(url, archive_path, cache_dir):
+        return None
+
+    try:
+        extract_archive(archive_path, extract_dir, member_names={binary_name})
+    except (ValueError, RuntimeError) as e:
+        logger.error(f"Failed to extract {binary_name} archive: {repr(e)}")
+        return None
+
+    extracted_binary = _find_extracted_binary(extract_dir, binary_name, 'macos')
+    if not extracted_binary:
+        return None
+    shutil.copy(extracted_binary, download_dir / binary_name)
+    return download_dir / binary_name
+
+
+def download_ffmpeg(tmpdir, download_dir, cache_dir=None):
+    """Download ffmpeg/ffprobe for the specified platform.
+
+    cache_dir is an optional persistent download cache (see download_file).
+    """
     ffmpeg_dir = tmpdir / 'ffmpeg'
     ffmpeg_dir.mkdir(exist_ok=True)
 
@@ -495,42 +1092,18 @@ def download_ffmpeg(tmpdir, download_dir):
         logger.warning(f"FFmpeg auto-download not supported for {platform_name}")
         return None, None
 
-    ffmpeg_bin = None
-    ffprobe_bin = None
-
-    # macOS requires separate downloads for ffmpeg and ffprobe
+    # macOS requires separate downloads for ffmpeg and ffprobe, fetched concurrently
     if platform_name == 'macos':
         macos_urls = urls[platform_name]
 
-        # Download ffmpeg
-        ffmpeg_archive = ffmpeg_dir / 'ffmpeg.zip'
-        if download_file(macos_urls['ffmpeg'], ffmpeg_archive):
-            try:
-                extract_archive(ffmpeg_archive, ffmpeg_dir / 'ffmpeg_extract')
-            except (ValueError, RuntimeError) as e:
-                logger.error(f"Failed to extract ffmpeg archive: {repr(e)}")
-                ffmpeg_bin = None
-            else:
-                for root, dirs, files in os.walk(ffmpeg_dir / 'ffmpeg_extract'):
-                    if 'ffmpeg' in files:
-                        shutil.copy(Path(root) / 'ffmpeg', download_dir / 'ffmpeg')
-                        ffmpeg_bin = download_dir / 'ffmpeg'
-                        break
-
-        # Download ffprobe
-        ffprobe_archive = ffmpeg_dir / 'ffprobe.zip'
-        if download_file(macos_urls['ffprobe'], ffprobe_archive):
-            try:
-                extract_archive(ffprobe_archive, ffmpeg_dir / 'ffprobe_extract')
-            except (ValueError, RuntimeError) as e:
-                logger.error(f"Failed to extract ffprobe archive: {repr(e)}")
-                ffprobe_bin = None
-            else:
-                for root, dirs, files in os.walk(ffmpeg_dir / 'ffprobe_extract'):
-                    if 'ffprobe' in files:
-                        shutil.copy(Path(root) / 'ffprobe', download_dir / 'ffprobe')
-                        ffprobe_bin = download_dir / 'ffprobe'
-                        break
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            ffmpeg_future = executor.submit(
+                _download_macos_ffmpeg_binary, 'ffmpeg', macos_urls['ffmpeg'], ffmpeg_dir, download_dir, cache_dir)
+            ffprobe_future = executor.submit(
+                _download_macos_ffmpeg_binary, 'ffprobe', macos_urls['ffprobe'], ffmpeg_dir, download_dir, cache_dir)
+
+            ffmpeg_bin = ffmpeg_future.result()
+            ffprobe_bin = ffprobe_future.result()
 
         return ffmpeg_bin, ffprobe_bin
 
@@ -538,71 +1111,66 @@ def download_ffmpeg(tmpdir, download_dir):
     url = urls[platform_name]
     archive_name = url.split('/')[-1]
     archive_path = ffmpeg_dir / archive_name
+    exe_suffix = '.exe' if platform_name == 'windows' else ''
+    # Only the two binaries are needed, not the docs, presets and models
+    binary_names = {f'ffmpeg{exe_suffix}', f'ffprobe{exe_suffix}'}
+
+    if archive_name.endswith(TAR_ARCHIVE_EXTENSIONS):
+        # Extract while downloading instead of writing the archive to disk first
+        if not download_and_extract_tar(url, ffmpeg_dir, cache_dir, member_names=binary_names):
+            # On Linux, try to find system-installed ffmpeg/ffprobe as fallback
+            if platform_name == 'linux':
+                logger.info("Download failed, checking for system-installed ffmpeg/ffprobe...")
+                return _copy_system_ffmpeg(download_dir)
+            return None, None
+    else:
+        if not download_file(url, archive_path, cache_dir):
+            # On Linux, try to find system-installed ffmpeg/ffprobe as fallback
+            if platform_name == 'linux':
+                logger.info("Download failed, checking for system-installed ffmpeg/ffprobe...")
+                return _copy_system_ffmpeg(download_dir)
+            return None, None
 
-    if not download_file(url, archive_path):
-        # On Linux, try to find system-installed ffmpeg/ffprobe as fallback
-        if platform_name == 'linux':
-            logger.info("Download failed, checking for system-installed ffmpeg/ffprobe...")
-            system_ffmpeg = shutil.which('ffmpeg')
-            system_ffprobe = shutil.which('ffprobe')
-
-            if system_ffmpeg and system_ffprobe:
-                # Copy system binaries to download_dir for bundling
-                ffmpeg_bin = download_dir / 'ffmpeg'
-                ffprobe_bin = download_dir / 'ffprobe'
-                shutil.copy2(system_ffmpeg, ffmpeg_bin)
-                shutil.copy2(system_ffprobe, ffprobe_bin)
-                logger.info(f"Using system ffmpeg from: {system_ffmpeg}")
-                logger.info(f"Using system ffprobe from: {system_ffprobe}")
-                return ffmpeg_bin, ffprobe_bin
-            else:
-                logger.warning("ffmpeg/ffprobe not found. Please install via: sudo apt-get install ffmpeg")
-        return None, None
+        try:
+            extract_archive(archive_path, ffmpeg_dir, member_names=binary_names)
+        except (ValueError, RuntimeError) as e:
+            logger.error(f"Failed to extract archive: {repr(e)}")
+            # On Linux, try to find system-installed ffmpeg/ffprobe as fallback
+            if platform_name == 'linux':
+                logger.info("Extraction failed, checking for system-installed ffmpeg/ffprobe...")
+                return _copy_system_ffmpeg(download_dir)
+            return None, None
 
-    try:
-        extract_archive(archive_path, ffmpeg_dir)
-    except (ValueError, RuntimeError) as e:
-        logger.error(f"Failed to extract archive: {repr(e)}")
-        # On Linux, try to find system-installed ffmpeg/ffprobe as fallback
-        if platform_name == 'linux':
-            logger.info("Extraction failed, checking for system-installed ffmpeg/ffprobe...")
-            system_ffmpeg = shutil.which('ffmpeg')
-            system_ffprobe = shutil.which('ffprobe')
-
-            if system_ffmpeg and system_ffprobe:
-                # Copy system binaries to download_dir for bundling
-                ffmpeg_bin = download_dir / 'ffmpeg'
-                ffprobe_bin = download_dir / 'ffprobe'
-                shutil.copy2(system_ffmpeg, ffmpeg_bin)
-                shutil.copy2(system_ffprobe, ffprobe_bin)
-                logger.info(f"Using system ffmpeg from: {system_ffmpeg}")
-                logger.info(f"Using system ffprobe from: {system_ffprobe}")
-                return ffmpeg_bin, ffprobe_bin
-            else:
-                logger.warning("ffmpeg/ffprobe not found. Please install via: sudo apt-get install ffmpeg")
-        return None, None
-    exe_suffix = '.exe' if platform_name == 'windows' else ''
+    ffmpeg_bin = None
+    ffprobe_bin = None
 
     # Find ffmpeg and ffprobe binaries
-    for root, dirs, files in os.walk(ffmpeg_dir):
-        if f'ffmpeg{exe_suffix}' in files and not ffmpeg_bin:
-            shutil.copy(Path(root) / f'ffmpeg{exe_suffix}', download_dir / f'ffmpeg{exe_suffix}')
-            ffmpeg_bin = download_dir / f'ffmpeg{exe_suffix}'
-        if f'ffprobe{exe_suffix}' in files and not ffprobe_bin:
-            shutil.copy(Path(root) / f'ffprobe{exe_suffix}', download_dir / f'ffprobe{exe_suffix}')
-            ffprobe_bin = download_dir / f'ffprobe{exe_suffix}'
+    extracted_ffmpeg = _find_extracted_binary(ffmpeg_dir, f'ffmpeg{exe_suffix}', platform_name)
+    if extracted_ffmpeg:
+        shutil.copy(extracted_ffmpeg, download_dir / f'ffmpeg{exe_suffix}')
+        ffmpeg_bin = download_dir / f'ffmpeg{exe_suffix}'
+    extracted_ffprobe = _find_extracted_binary(ffmpeg_dir, f'ffprobe{exe_suffix}', platform_name)
+    if extracted_ffprobe:
+        shutil.copy(extracted_ffprobe, download_dir / f'ffprobe{exe_suffix}')
+        ffprobe_bin = download_dir / f'ffprobe{exe_suffix}'
 
     return ffmpeg_bin, ffprobe_bin
 
 
 
-def download_dependencies(deps_dir, progress_callback=None):
+def download_dependencies(deps_dir, progress_callback=None, force_download=False, cache_dir=None):
     """
     Download HandBrakeCLI, ffprobe, and ffmpeg to deps_dir directory.
 
+    Downloading is skipped if valid binaries are already present in deps_dir.
+
     Args:
         progress_callback: Optional callback function to report progress.
                           Called with status messages as strings.
+        force_download: If True, download even if valid binaries already exist
+        cache_dir: Optional directory to keep downloaded archives in, so later calls
+                   (e.g. repeated builds) don't download them again. Without it the
+                   archives are discarded once the binaries are extracted.
 
     Returns:
         tuple: (handbrake_path, ffprobe_path, ffmpeg_path) as strings, or (None, None, None) on failure
@@ -633,13 +1201,11 @@ def download_dependencies(deps_dir, progress_callback=None):
         ffprobe_path = deps_dir / ffprobe_exe
         ffmpeg_path = deps_dir / ffmpeg_exe
 
-        if handbrake_path.exists() and ffprobe_path.exists() and ffmpeg_path.exists():
+        if not force_download and handbrake_path.exists() and ffprobe_path.exists() and ffmpeg_path.exists():
             # Validate existing dependencies
-            handbrake_valid, _ = check_single_dependency(str(handbrake_path))
-            ffprobe_valid, _ = check_single_dependency(str(ffprobe_path))
-            ffmpeg_valid, _ = check_single_dependency(str(ffmpeg_path))
+            results = check_dependencies([str(handbrake_path), str(ffprobe_path), str(ffmpeg_path)])
 
-            if handbrake_valid and ffprobe_valid and ffmpeg_valid:
+            if all(is_valid for is_valid, _ in results):
                 msg = "Dependencies already exist and are valid. Skipping download."
                 if progress_callback:
                     progress_callback(msg)
@@ -651,29 +1217,38 @@ def download_dependencies(deps_dir, progress_callback=None):
                     progress_callback(msg)
                 logger.info(msg)
 
-        with tempfile.TemporaryDirectory() as tmpdirname:
+        # Stage archives and extracted trees in deps_dir: being on the same filesystem
+        # as a download cache inside it lets archives be hardlinked instead of copied,
+        # and the extracted trees are removed once the binaries have been copied out
+        with _used_cache_entries_lock:
+            _used_cache_entries.clear()
+        with tempfile.TemporaryDirectory(dir=deps_dir, prefix='download_') as tmpdirname:
             tmpdir = Path(tmpdirname)
 
-            # Download HandBrakeCLI
-            msg = f"Downloading HandBrakeCLI for {system}..."
+            # HandBrakeCLI and ffmpeg (includes ffprobe) come from different hosts and
+            # extract into separate subdirectories, so download them concurrently
+            msg = f"Downloading HandBrakeCLI and ffmpeg/ffprobe for {system}..."
             if progress_callback:
                 progress_callback(msg)
             logger.info(msg)
 
-            handbrake_path = download_handbrake(tmpdir, deps_dir)
-            if handbrake_path is None:
-                raise Exception('Failed to download or find HandBrakeCLI')
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                handbrake_future = executor.submit(download_handbrake, tmpdir, deps_dir, cache_dir)
+                ffmpeg_future = executor.submit(download_ffmpeg, tmpdir, deps_dir, cache_dir)
 
-            # Download ffmpeg (includes ffprobe)
-            msg = f"Downloading ffmpeg/ffprobe for {system}..."
-            if progress_callback:
-                progress_callback(msg)
-            logger.info(msg)
+                handbrake_path = handbrake_future.result()
+                ffmpeg_path, ffprobe_path = ffmpeg_future.result()
 
-            ffmpeg_path, ffprobe_path = download_ffmpeg(tmpdir, deps_dir)
+            if handbrake_path is None:
+                raise Exception('Failed to download or find HandBrakeCLI')
             if ffmpeg_path is None or ffprobe_path is None:
                 raise Exception('Failed to download or find ffmpeg/ffprobe')
 
+        if cache_dir is not None:
+            with _used_cache_entries_lock:
+                used_entries = set(_used_cache_entries)
+            _prune_download_cache(Path(cache_dir), used_entries)
+
         # Make executables executable on Unix-like systems
         if system in ["Linux", "Darwin"]:
             os.chmod(str(handbrake_path), 0o755)
@@ -16,3 +16,11 @@ from pathlib import Path
 # Add the src directory to Python path so tests can import modules
 src_dir = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_dir))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_home(tmp_path, monkeypatch):
+    """Keep caches written by the code under test (e.g. the codec cache) out of the user's cache directory."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
@@ -3,7 +3,15 @@
 Unit tests for build_executable.py
 """
 
+import ast
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
 import unittest
+import zipfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
 
@@ -50,11 +58,25 @@ class TestInstallPyinstaller(unittest.TestCase):
         """Test when PyInstaller is already installed."""
         # Create a mock PyInstaller module
         mock_pyinstaller = MagicMock()
+        mock_pyinstaller.__version__ = build_executable.PYINSTALLER_VERSION
+        
+        with patch.dict('sys.modules', {'PyInstaller': mock_pyinstaller}), \
+                patch('build_executable.subprocess.check_call') as mock_check_call:
+            build_executable.install_pyinstaller()
+        
+        mock_check_call.assert_not_called()
+    
+    @patch('build_executable.subprocess.check_call')
+    def test_install_pyinstaller_other_version(self, mock_check_call):
+        """Test that a different installed PyInstaller version is replaced by the pinned one."""
+        mock_pyinstaller = MagicMock()
         mock_pyinstaller.__version__ = '5.0.0'
         
         with patch.dict('sys.modules', {'PyInstaller': mock_pyinstaller}):
-            # Should not raise any errors
             build_executable.install_pyinstaller()
+        
+        call_args = mock_check_call.call_args[0][0]
+        self.assertIn(f'pyinstaller=={build_executable.PYINSTALLER_VERSION}', call_args)
     
     @patch('build_executable.subprocess.check_call')
     @patch('builtins.__import__')
@@ -76,7 +98,7 @@ class TestInstallPyinstaller(unittest.TestCase):
         call_args = mock_check_call.call_args[0][0]
         self.assertIn('pip', call_args)
         self.assertIn('install', call_args)
-        self.assertIn('pyinstaller', call_args)
+        self.assertIn(f'pyinstaller=={build_executable.PYINSTALLER_VERSION}', call_args)
 
 
 class TestCreateSpecFile(unittest.TestCase):
@@ -144,6 +166,57 @@ class TestCreateSpecFile(unittest.TestCase):
         written_content = ''.join(call[0][0] for call in handle.write.call_args_list)
         self.assertIn('console=False', written_content)
     
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_spec_file_upx_disabled_by_default(self, mock_file):
+        """Test that UPX compression is off unless requested."""
+        build_executable.create_spec_file('linux', self.binaries_data)
+        
+        handle = mock_file()
+        written_content = ''.join(call[0][0] for call in handle.write.call_args_list)
+        self.assertIn('upx=False', written_content)
+    
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_spec_file_upx_enabled(self, mock_file):
+        """Test that UPX compression can be enabled."""
+        build_executable.create_spec_file('linux', self.binaries_data, upx=True)
+        
+        handle = mock_file()
+        written_content = ''.join(call[0][0] for call in handle.write.call_args_list)
+        self.assertIn('upx=True', written_content)
+    
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_spec_file_upx_excludes_bundled_tools(self, mock_file):
+        """Test that the bundled tools are excluded from UPX compression."""
+        build_executable.create_spec_file('windows', self.binaries_data, upx=True)
+        
+        handle = mock_file()
+        written_content = ''.join(call[0][0] for call in handle.write.call_args_list)
+        self.assertIn("'ffmpeg.exe'", written_content)
+        self.assertIn("'HandBrakeCLI.exe'", written_content)
+    
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_spec_file_optimize(self, mock_file):
+        """Test that bundled bytecode is optimized."""
+        build_executable.create_spec_file('linux', self.binaries_data)
+        
+        handle = mock_file()
+        written_content = ''.join(call[0][0] for call in handle.write.call_args_list)
+        self.assertIn('optimize=2', written_content)
+    
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_spec_file_quotes_paths(self, mock_file):
+        """Test that paths with quotes, spaces and backslashes yield a valid spec."""
+        binaries_data = {
+            'handbrake': "/path/with space/it's\\HandBrakeCLI",
+            'ffmpeg': {'ffmpeg': '/path/to/ffmpeg', 'ffprobe': None}
+        }
+        build_executable.create_spec_file('windows', binaries_data)
+        
+        handle = mock_file()
+        written_content = ''.join(call[0][0] for call in handle.write.call_args_list)
+        ast.parse(written_content)
+        self.assertEqual(written_content.count('binaries.append('), 2)
+    
     @patch('builtins.open', new_callable=mock_open)
     def test_create_spec_file_no_binaries(self, mock_file):
         """Test spec file creation without binaries."""
@@ -184,9 +257,80 @@ class TestBuildWithPyinstaller(unittest.TestCase):
         # Check command arguments
         call_args = mock_check_call.call_args[0][0]
         self.assertIn('PyInstaller', call_args)
-        self.assertIn('--clean', call_args)
+        self.assertNotIn('--clean', call_args)
         self.assertIn('--noconfirm', call_args)
     
+    @patch('build_executable.subprocess.check_call')
+    def test_build_with_pyinstaller_no_debug_ranges(self, mock_check_call):
+        """Test that PyInstaller runs with PYTHONNODEBUGRANGES set."""
+        build_executable.build_with_pyinstaller(Path('test.spec'))
+        
+        env = mock_check_call.call_args[1]['env']
+        self.assertEqual(env['PYTHONNODEBUGRANGES'], '1')
+    
+    @patch('build_executable.subprocess.check_call')
+    def test_build_with_pyinstaller_config_dir_per_spec(self, mock_check_call):
+        """Test that each spec builds with its own PyInstaller config (and binary cache) dir."""
+        build_executable.build_with_pyinstaller(Path('cli.spec'))
+        cli_config_dir = mock_check_call.call_args[1]['env']['PYINSTALLER_CONFIG_DIR']
+        build_executable.build_with_pyinstaller(Path('gui.spec'))
+        gui_config_dir = mock_check_call.call_args[1]['env']['PYINSTALLER_CONFIG_DIR']
+        
+        self.assertEqual(Path(cli_config_dir).name, 'cli')
+        self.assertEqual(Path(gui_config_dir).name, 'gui')
+        self.assertEqual(Path(cli_config_dir).parent, Path(gui_config_dir).parent)
+    
+    @patch('build_executable.subprocess.check_call')
+    def test_build_with_pyinstaller_ram_workpath(self, mock_check_call):
+        """Test that the work path can be placed on the RAM disk."""
+        with tempfile.TemporaryDirectory() as ram_disk:
+            with patch('build_executable.RAM_DISK_DIR', ram_disk):
+                build_executable.build_with_pyinstaller(Path('test.spec'), in_memory_workpath=True)
+            
+            call_args = mock_check_call.call_args[0][0]
+            work_dir = Path(call_args[call_args.index('--workpath') + 1])
+            self.assertEqual(work_dir.parent.parent, Path(ram_disk))
+    
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'RAM disk work path is only used on Linux')
+    def test_get_pyinstaller_work_dir_unknown_user(self):
+        """Test that the RAM disk work path falls back to the UID when the user name is unknown."""
+        with tempfile.TemporaryDirectory() as ram_disk:
+            with patch('build_executable.RAM_DISK_DIR', ram_disk), \
+                    patch('build_executable.getpass.getuser', side_effect=KeyError('uid not found')):
+                work_dir = build_executable.get_pyinstaller_work_dir(in_memory=True)
+            
+            self.assertEqual(work_dir, Path(ram_disk) / f'convert_videos-{os.getuid()}' / 'pyinstaller')
+    
+    def test_get_pyinstaller_work_dir_without_ram_disk(self):
+        """Test falling back to the cache directory when there is no RAM disk."""
+        with tempfile.TemporaryDirectory() as cache_home:
+            with patch.dict(os.environ, {'XDG_CACHE_HOME': cache_home}), \
+                    patch('build_executable.RAM_DISK_DIR', os.path.join(cache_home, 'missing')):
+                work_dir = build_executable.get_pyinstaller_work_dir(in_memory=True)
+            
+            self.assertEqual(work_dir, Path(cache_home) / 'convert_videos' / 'pyinstaller')
+    
+    @patch('build_executable.subprocess.check_call')
+    def test_build_with_pyinstaller_clean(self, mock_check_call):
+        """Test that a clean build passes --clean to PyInstaller."""
+        result = build_executable.build_with_pyinstaller(Path('test.spec'), clean=True)
+        
+        self.assertTrue(result)
+        call_args = mock_check_call.call_args[0][0]
+        self.assertIn('--clean', call_args)
+    
+    @patch('build_executable.subprocess.check_call')
+    def test_build_with_pyinstaller_persistent_workpath(self, mock_check_call):
+        """Test that the work path is kept in the user cache directory."""
+        with tempfile.TemporaryDirectory() as cache_home:
+            with patch.dict(os.environ, {'XDG_CACHE_HOME': cache_home}):
+                build_executable.build_with_pyinstaller(Path('test.spec'))
+            
+            call_args = mock_check_call.call_args[0][0]
+            work_dir = call_args[call_args.index('--workpath') + 1]
+            self.assertEqual(Path(work_dir), Path(cache_home) / 'convert_videos' / 'pyinstaller')
+            self.assertTrue(Path(work_dir).is_dir())
+    
     @patch('build_executable.subprocess.check_call')
     def test_build_with_pyinstaller_failure(self, mock_check_call):
         """Test failed PyInstaller build."""
@@ -201,10 +345,9 @@ class TestBuildWithPyinstaller(unittest.TestCase):
 class TestCreateDistributionPackage(unittest.TestCase):
     """Test distribution package creation."""
     
-    @patch('build_executable.shutil.make_archive')
-    @patch('build_executable.shutil.copy2')
+    @patch('build_executable.create_zip_archive')
     @patch('build_executable.Path')
-    def test_create_distribution_package_windows(self, mock_path_class, mock_copy, mock_archive):
+    def test_create_distribution_package_windows(self, mock_path_class, mock_archive):
         """Test creating distribution package for Windows."""
         # Create mock Path instances
         mock_dist = MagicMock()
@@ -233,13 +376,10 @@ class TestCreateDistributionPackage(unittest.TestCase):
         
         # Should create zip archive for Windows
         mock_archive.assert_called_once()
-        call_args = mock_archive.call_args[0]
-        self.assertIn('zip', call_args)
     
-    @patch('build_executable.shutil.make_archive')
-    @patch('build_executable.shutil.copy2')
+    @patch('build_executable.create_tar_gz_archive')
     @patch('build_executable.Path')
-    def test_create_distribution_package_linux(self, mock_path_class, mock_copy, mock_archive):
+    def test_create_distribution_package_linux(self, mock_path_class, mock_archive):
         """Test creating distribution package for Linux."""
         # Create mock Path instances
         mock_dist = MagicMock()
@@ -262,10 +402,11 @@ class TestCreateDistributionPackage(unittest.TestCase):
         
         build_executable.create_distribution_package('linux')
         
-        # Should create tar.gz archive for Linux
+        # Should create tar.gz archive for Linux, straight from the built executables
         mock_archive.assert_called_once()
-        call_args = mock_archive.call_args[0]
-        self.assertIn('gztar', call_args)
+        package_files = mock_archive.call_args.args[0]
+        self.assertEqual([arcname for _, arcname in package_files[:3]],
+                         ['convert_videos_cli', 'duplicate_detector', 'convert_videos_gui'])
     
     @patch('build_executable.Path.exists')
     def test_create_distribution_package_no_cli_exe(self, mock_exists):
@@ -278,6 +419,99 @@ class TestCreateDistributionPackage(unittest.TestCase):
         self.assertEqual(cm.exception.code, 1)
 
 
+class TestCreateZipArchive(unittest.TestCase):
+    """Test distribution zip creation."""
+    
+    def test_create_zip_archive_stores_executables(self):
+        """Test that executables are stored and other files are deflated."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exe_path = Path(temp_dir) / 'dist' / 'convert_videos_cli.exe'
+            exe_path.parent.mkdir()
+            exe_path.write_bytes(b'exe' * 100)
+            readme_path = Path(temp_dir) / 'README.md'
+            readme_path.write_text('readme ' * 100)
+            archive_path = Path(temp_dir) / 'package.zip'
+            
+            build_executable.create_zip_archive(
+                [(exe_path, 'convert_videos_cli.exe'), (readme_path, 'README.md')], archive_path)
+            
+            with zipfile.ZipFile(archive_path) as zip_file:
+                infos = {info.filename: info for info in zip_file.infolist()}
+                self.assertEqual(sorted(infos), ['README.md', 'convert_videos_cli.exe'])
+                self.assertEqual(infos['convert_videos_cli.exe'].compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(infos['README.md'].compress_type, zipfile.ZIP_DEFLATED)
+                self.assertEqual(zip_file.read('convert_videos_cli.exe'), b'exe' * 100)
+
+
+class TestCreateTarGzArchive(unittest.TestCase):
+    """Test distribution tarball creation."""
+    
+    def _create_and_list(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exe_path = Path(temp_dir) / 'dist' / 'convert_videos_cli'
+            exe_path.parent.mkdir()
+            exe_path.write_text('exe')
+            exe_path.chmod(0o755)
+            readme_path = Path(temp_dir) / 'README.md'
+            readme_path.write_text('readme')
+            archive_path = Path(temp_dir) / 'package.tar.gz'
+            
+            build_executable.create_tar_gz_archive(
+                [(exe_path, 'convert_videos_cli'), (readme_path, 'README.md')], archive_path)
+            
+            with tarfile.open(archive_path, 'r:gz') as tar:
+                if os.name != 'nt':
+                    self.assertTrue(tar.getmember('./convert_videos_cli').mode & 0o111)
+                return sorted(tar.getnames())
+    
+    @patch('build_executable.shutil.which', return_value=None)
+    def test_create_tar_gz_archive_tarfile(self, mock_which):
+        """Test archive creation with the built-in gzip."""
+        names = self._create_and_list()
+        self.assertEqual(names, ['./README.md', './convert_videos_cli'])
+    
+    @unittest.skipUnless(shutil.which('pigz'), 'pigz not installed')
+    def test_create_tar_gz_archive_pigz(self):
+        """Test archive creation with pigz produces the same layout."""
+        names = self._create_and_list()
+        self.assertEqual(names, ['./README.md', './convert_videos_cli'])
+
+
+class TestBuildManifest(unittest.TestCase):
+    """Test build input fingerprinting and the build manifest."""
+    
+    def test_fingerprint_changes_with_inputs(self):
+        """Test that the fingerprint changes when an input file changes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spec_file = Path(temp_dir) / 'app.spec'
+            source_file = Path(temp_dir) / 'app.py'
+            spec_file.write_text('spec')
+            source_file.write_text('print(1)')
+            
+            first = build_executable.get_build_fingerprint(spec_file, [source_file])
+            self.assertEqual(first, build_executable.get_build_fingerprint(spec_file, [source_file]))
+            
+            source_file.write_text('print(2)')
+            self.assertNotEqual(first, build_executable.get_build_fingerprint(spec_file, [source_file]))
+    
+    def test_fingerprint_missing_input(self):
+        """Test that a missing input yields no fingerprint."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spec_file = Path(temp_dir) / 'app.spec'
+            spec_file.write_text('spec')
+            
+            self.assertIsNone(build_executable.get_build_fingerprint(spec_file, [Path(temp_dir) / 'missing']))
+    
+    def test_manifest_round_trip(self):
+        """Test saving and loading the manifest, and loading a missing one."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = Path(temp_dir) / build_executable.BUILD_MANIFEST_NAME
+            self.assertEqual(build_executable.load_build_manifest(manifest_path), {})
+            
+            build_executable.save_build_manifest(manifest_path, {'convert_videos_cli': 'abc'})
+            self.assertEqual(build_executable.load_build_manifest(manifest_path), {'convert_videos_cli': 'abc'})
+
+
 class TestMain(unittest.TestCase):
     """Test main build function."""
     
@@ -301,8 +535,9 @@ class TestMain(unittest.TestCase):
         # Should install PyInstaller
         mock_install.assert_called_once()
         
-        # Should download dependencies
+        # Should download dependencies, keeping the archives for the next build
         mock_download.assert_called_once()
+        self.assertIsNotNone(mock_download.call_args.kwargs['cache_dir'])
         
         # Should create spec files (CLI and GUI)
         self.assertEqual(mock_create_spec.call_count, 3)
@@ -362,6 +597,110 @@ class TestMain(unittest.TestCase):
             build_executable.main()
         self.assertEqual(cm.exception.code, 1)
     
+    @patch('build_executable.create_distribution_package')
+    @patch('build_executable.build_with_pyinstaller')
+    @patch('build_executable.create_spec_file')
+    @patch('build_executable.dependencies_utils.download_dependencies')
+    @patch('build_executable.Path.mkdir')
+    @patch('build_executable.install_pyinstaller')
+    @patch('build_executable.get_platform')
+    @patch('sys.argv', ['build_executable.py', '--jobs', '3'])
+    def test_main_parallel_builds(self, mock_get_platform, mock_install, mock_mkdir,
+                                  mock_download, mock_create_spec, mock_build, mock_package):
+        """Test that --jobs runs the PyInstaller builds concurrently."""
+        mock_get_platform.return_value = 'linux'
+        mock_download.return_value = ('/handbrake', '/ffprobe', '/ffmpeg')
+        mock_create_spec.side_effect = ['cli.spec', 'dd.spec', 'gui.spec']
+        
+        # Each build waits until all three have started
+        barrier = threading.Barrier(3, timeout=5)
+        mock_build.side_effect = lambda spec_file, **kwargs: barrier.wait() is not None
+        
+        build_executable.main()
+        
+        built_specs = sorted(call[0][0] for call in mock_build.call_args_list)
+        self.assertEqual(built_specs, ['cli.spec', 'dd.spec', 'gui.spec'])
+        mock_package.assert_called_once()
+    
+    @patch('build_executable.create_distribution_package')
+    @patch('build_executable.build_with_pyinstaller')
+    @patch('build_executable.create_spec_file')
+    @patch('build_executable.dependencies_utils.download_dependencies')
+    @patch('build_executable.Path.mkdir')
+    @patch('build_executable.install_pyinstaller')
+    @patch('build_executable.get_platform')
+    @patch('sys.argv', ['build_executable.py', '--jobs', '3', '--fresh-pyinstaller'])
+    def test_main_fresh_builds_run_one_at_a_time(self, mock_get_platform, mock_install, mock_mkdir,
+                                                 mock_download, mock_create_spec, mock_build, mock_package):
+        """Test that --fresh-pyinstaller doesn't clean the shared cache under concurrent builds."""
+        mock_get_platform.return_value = 'linux'
+        mock_download.return_value = ('/handbrake', '/ffprobe', '/ffmpeg')
+        running = []
+        overlapped = []
+        
+        def build(spec_file, **kwargs):
+            overlapped.append(bool(running))
+            running.append(spec_file)
+            time.sleep(0.05)
+            running.remove(spec_file)
+            return True
+        
+        mock_build.side_effect = build
+        
+        build_executable.main()
+        
+        self.assertEqual(overlapped, [False, False, False])
+        self.assertTrue(all(call.kwargs['clean'] for call in mock_build.call_args_list))
+    
+    @patch('build_executable.save_build_manifest')
+    @patch('build_executable.load_build_manifest')
+    @patch('build_executable.get_build_fingerprint', return_value='fingerprint')
+    @patch('build_executable.Path.exists', return_value=True)
+    @patch('build_executable.create_distribution_package')
+    @patch('build_executable.build_with_pyinstaller')
+    @patch('build_executable.create_spec_file')
+    @patch('build_executable.dependencies_utils.download_dependencies')
+    @patch('build_executable.Path.mkdir')
+    @patch('build_executable.install_pyinstaller')
+    @patch('build_executable.get_platform')
+    @patch('sys.argv', ['build_executable.py'])
+    def test_main_skips_up_to_date_builds(self, mock_get_platform, mock_install, mock_mkdir,
+                                          mock_download, mock_create_spec, mock_build, mock_package,
+                                          mock_exists, mock_fingerprint, mock_load, mock_save):
+        """Test that executables built from unchanged inputs are not rebuilt."""
+        mock_get_platform.return_value = 'linux'
+        mock_download.return_value = ('/handbrake', '/ffprobe', '/ffmpeg')
+        mock_build.return_value = True
+        mock_load.return_value = {'convert_videos_cli': 'fingerprint', 'duplicate_detector': 'stale'}
+        
+        build_executable.main()
+        
+        # Only the duplicate detector (changed) and GUI (never built) are rebuilt
+        self.assertEqual(mock_build.call_count, 2)
+        saved_manifest = mock_save.call_args[0][1]
+        self.assertEqual(saved_manifest, {'convert_videos_cli': 'fingerprint',
+                                          'duplicate_detector': 'fingerprint',
+                                          'convert_videos_gui': 'fingerprint'})
+        mock_package.assert_called_once()
+    
+    @patch('build_executable.build_with_pyinstaller')
+    @patch('build_executable.create_spec_file')
+    @patch('build_executable.dependencies_utils.download_dependencies')
+    @patch('build_executable.Path.mkdir')
+    @patch('build_executable.install_pyinstaller')
+    @patch('build_executable.get_platform')
+    @patch('sys.argv', ['build_executable.py'])
+    def test_main_cli_build_failure_skips_remaining(self, mock_get_platform, mock_install, mock_mkdir,
+                                                    mock_download, mock_create_spec, mock_build):
+        """Test that sequential builds stop at the first failure."""
+        mock_get_platform.return_value = 'linux'
+        mock_download.return_value = ('/handbrake', '/ffprobe', '/ffmpeg')
+        mock_build.return_value = False
+        
+        with self.assertRaises(SystemExit):
+            build_executable.main()
+        mock_build.assert_called_once()
+    
     @patch('build_executable.create_distribution_package')
     @patch('build_executable.build_with_pyinstaller')
     @patch('build_executable.create_spec_file')
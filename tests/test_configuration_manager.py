@@ -58,6 +58,11 @@ class TestFileSizeParsing(unittest.TestCase):
         # Multiple spaces or numbers should fail
         with self.assertRaises(ValueError):
             configuration_manager.parse_file_size("1 2 GB")
+        
+        # Only plain decimal numbers are accepted
+        for size in ("1.", ".5", "1e3", "1_000", "inf", "GB", "1 XB"):
+            with self.assertRaises(ValueError):
+                configuration_manager.parse_file_size(size)
     
     def test_parse_file_size_negative(self):
         """Test that negative values raise ValueError."""
@@ -107,6 +112,23 @@ class TestValidationFunctions(unittest.TestCase):
         self.assertFalse(configuration_manager.validate_preset('invalid'))
         self.assertFalse(configuration_manager.validate_preset(''))
     
+    def test_supported_presets_are_listed_once(self):
+        """Test that presets shared by x265 and NVENC are only offered once."""
+        presets = configuration_manager.SUPPORTED_PRESETS
+        self.assertEqual(len(presets), len(set(presets)))
+        self.assertEqual(presets[0], 'ultrafast')
+        self.assertIn('default', presets)
+    
+    def test_validate_jobs(self):
+        """Test parallel conversion count validation."""
+        self.assertTrue(configuration_manager.validate_jobs(1))
+        self.assertTrue(configuration_manager.validate_jobs(4))
+        
+        self.assertFalse(configuration_manager.validate_jobs(0))
+        self.assertFalse(configuration_manager.validate_jobs(-1))
+        self.assertFalse(configuration_manager.validate_jobs('2'))
+        self.assertFalse(configuration_manager.validate_jobs(True))
+    
     def test_validate_quality(self):
         """Test quality validation."""
         # Valid quality values
@@ -240,6 +262,20 @@ class TestConfigLoading(unittest.TestCase):
             self.assertIn('encoder', config['output'])
             self.assertIn('preset', config['output'])
             self.assertIn('quality', config['output'])
+            self.assertIs(config['output']['hw_decoding'], False)
+        finally:
+            os.unlink(config_path)
+    
+    def test_load_config_invalid_hw_decoding(self):
+        """Test that a non-boolean hw_decoding is reported."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump({'output': {'hw_decoding': 'yes please'}}, f)
+            config_path = f.name
+        
+        try:
+            config, errors = configuration_manager.load_config(config_path)
+            
+            self.assertTrue(any('hw_decoding' in error for error in errors))
         finally:
             os.unlink(config_path)
     
@@ -262,6 +298,27 @@ class TestConfigLoading(unittest.TestCase):
         finally:
             os.unlink(config_path)
     
+    def test_load_config_invalid_section_types(self):
+        """Test that nested sections of the wrong type fall back to defaults."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            config_data = {
+                'output': 'mp4',
+                'logging': ['not', 'a', 'dict'],
+                'dependencies': {'ffmpeg': '/opt/ffmpeg/bin/ffmpeg'}
+            }
+            yaml.dump(config_data, f)
+            config_path = f.name
+        
+        try:
+            config, errors = configuration_manager.load_config(config_path)
+            
+            self.assertEqual(config['output']['format'], 'mkv')
+            self.assertIsInstance(config['logging'], dict)
+            # Unset dependencies keep their defaults
+            self.assertIn('handbrake', config['dependencies'])
+        finally:
+            os.unlink(config_path)
+    
     def test_load_config_invalid_yaml(self):
         """Test handling of invalid YAML file."""
         with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
@@ -4,6 +4,9 @@ Unit tests for convert_videos.py
 """
 
 import os
+import sqlite3
+import sys
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 import tempfile
@@ -58,7 +61,7 @@ class TestGetDuration(unittest.TestCase):
         mock_run.return_value = mock_result
         
         duration = convert_videos.get_duration('/test/file.mp4')
-        self.assertEqual(duration, 123)
+        self.assertEqual(duration, 123.45)
     
     @patch('subprocess_utils.run_command')
     def test_get_duration_integer(self, mock_run):
@@ -177,6 +180,196 @@ class TestFindEligibleFiles(unittest.TestCase):
             # Only normal file should be eligible
             self.assertEqual(len(eligible), 1)
             self.assertIn('normal.mp4', str(eligible[0]))
+    
+    @patch('convert_videos.get_codec')
+    def test_find_eligible_files_walks_subdirectories(self, mock_get_codec):
+        """Test that video files are found recursively, whatever the case of their extension."""
+        mock_get_codec.return_value = 'h264'
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            nested = Path(temp_dir) / "shows" / "season 1"
+            nested.mkdir(parents=True)
+            (nested / "episode.MKV").write_bytes(b'x' * 30)
+            (Path(temp_dir) / "movie.avi").write_bytes(b'x' * 20)
+            (Path(temp_dir) / "notes.txt").write_bytes(b'x' * 40)
+            (Path(temp_dir) / "folder.mp4").mkdir()
+            
+            eligible = convert_videos.find_eligible_files(temp_dir, min_size_bytes=1)
+            
+            self.assertEqual([path.name for path in eligible], ['episode.MKV', 'movie.avi'])
+    
+    @patch('convert_videos.CODEC_PROBE_WORKERS', 2)
+    @patch('convert_videos.get_codec')
+    def test_find_eligible_files_probes_concurrently(self, mock_get_codec):
+        """Test that codecs of several files are probed at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def codec_side_effect(path, config=None):
+            # Both probes must be running at once to pass the barrier
+            barrier.wait()
+            return 'hevc' if 'hevc' in path.name else 'h264'
+        
+        mock_get_codec.side_effect = codec_side_effect
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "hevc.mkv").write_bytes(b'x' * 10)
+            (Path(temp_dir) / "h264.mp4").write_bytes(b'x' * 20)
+            
+            eligible = convert_videos.find_eligible_files(temp_dir, min_size_bytes=1)
+            
+            self.assertEqual([path.name for path in eligible], ['h264.mp4'])
+
+
+class TestCodecCache(unittest.TestCase):
+    """Test caching probed codecs between scans."""
+    
+    def _scan(self, temp_dir):
+        return convert_videos.find_eligible_files(temp_dir, min_size_bytes=1)
+    
+    @patch('convert_videos.get_codec')
+    def test_unchanged_files_are_not_probed_again(self, mock_get_codec):
+        """Test that a rescan reuses the codecs of unchanged files."""
+        mock_get_codec.side_effect = lambda path, config=None: 'hevc' if 'hevc' in path.name else 'h264'
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "hevc.mkv").write_bytes(b'x' * 10)
+            (Path(temp_dir) / "h264.mp4").write_bytes(b'x' * 20)
+            
+            first = self._scan(temp_dir)
+            self.assertEqual(mock_get_codec.call_count, 2)
+            second = self._scan(temp_dir)
+            
+            self.assertEqual(mock_get_codec.call_count, 2)
+            self.assertEqual(first, second)
+            self.assertEqual([path.name for path in second], ['h264.mp4'])
+    
+    @patch('convert_videos.get_codec')
+    def test_changed_files_are_probed_again(self, mock_get_codec):
+        """Test that a file modified since the last scan is probed again."""
+        mock_get_codec.return_value = 'h264'
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            video = Path(temp_dir) / "video.mp4"
+            video.write_bytes(b'x' * 10)
+            self._scan(temp_dir)
+            
+            video.write_bytes(b'x' * 30)
+            mock_get_codec.return_value = 'hevc'
+            
+            self.assertEqual(self._scan(temp_dir), [])
+            self.assertEqual(mock_get_codec.call_count, 2)
+    
+    @patch('convert_videos.get_codec')
+    def test_failed_probes_are_not_cached(self, mock_get_codec):
+        """Test that a file whose probe failed is probed again on the next scan."""
+        mock_get_codec.return_value = None
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "video.mp4").write_bytes(b'x' * 10)
+            self._scan(temp_dir)
+            self._scan(temp_dir)
+            
+            self.assertEqual(mock_get_codec.call_count, 2)
+    
+    @patch('convert_videos.get_codec')
+    def test_empty_probe_results_are_not_cached(self, mock_get_codec):
+        """Test that a probe reporting no codec is retried on the next scan."""
+        mock_get_codec.return_value = ''
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "video.mp4").write_bytes(b'x' * 10)
+            self._scan(temp_dir)
+            self._scan(temp_dir)
+            
+            self.assertEqual(mock_get_codec.call_count, 2)
+    
+    @patch('convert_videos.get_codec', return_value='h264')
+    def test_removed_files_are_evicted(self, mock_get_codec):
+        """Test that cached codecs of files no longer found under the scanned root are dropped."""
+        with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as other_dir:
+            library = Path(temp_dir) / "library"
+            library.mkdir()
+            kept = library / "kept.mp4"
+            removed = library / "removed.mp4"
+            other = Path(other_dir) / "other.mp4"
+            for video in (kept, removed, other):
+                video.write_bytes(b'x' * 10)
+            # A sibling directory sharing the root's name as a prefix is outside the root
+            sibling = Path(temp_dir) / "library2"
+            sibling.mkdir()
+            (sibling / "sibling.mp4").write_bytes(b'x' * 10)
+            self._scan(temp_dir)
+            self._scan(other_dir)
+            
+            removed.unlink()
+            self._scan(library)
+            
+            connection = sqlite3.connect(convert_videos.get_codec_cache_path())
+            try:
+                cached = {Path(row[0]).name for row in connection.execute('SELECT path FROM codec_cache')}
+            finally:
+                connection.close()
+            self.assertEqual(cached, {'kept.mp4', 'sibling.mp4', 'other.mp4'})
+    
+    @patch('convert_videos.get_codec', return_value='h264')
+    def test_unreadable_directories_are_not_evicted(self, mock_get_codec):
+        """Test that a directory failing to list during a scan keeps its cached codecs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            readable = Path(temp_dir) / "readable"
+            unreadable = Path(temp_dir) / "unreadable"
+            for directory in (readable, unreadable):
+                directory.mkdir()
+                (directory / "video.mp4").write_bytes(b'x' * 10)
+            (readable / "removed.mp4").write_bytes(b'x' * 10)
+            self._scan(temp_dir)
+            self.assertEqual(mock_get_codec.call_count, 3)
+            
+            (readable / "removed.mp4").unlink()
+            real_scandir = os.scandir
+            
+            def scandir(path):
+                if Path(path) == unreadable:
+                    raise PermissionError(13, "Permission denied", str(path))
+                return real_scandir(path)
+            
+            with patch('convert_videos.os.scandir', side_effect=scandir):
+                self._scan(temp_dir)
+            
+            connection = sqlite3.connect(convert_videos.get_codec_cache_path())
+            try:
+                cached = {os.path.relpath(row[0], temp_dir) for row in connection.execute('SELECT path FROM codec_cache')}
+            finally:
+                connection.close()
+            self.assertEqual(cached, {os.path.join("readable", "video.mp4"), os.path.join("unreadable", "video.mp4")})
+            self._scan(temp_dir)
+            self.assertEqual(mock_get_codec.call_count, 3)
+    
+    @patch('convert_videos.get_codec')
+    def test_codec_cache_can_be_disabled(self, mock_get_codec):
+        """Test that CONVERT_VIDEOS_CODEC_CACHE=0 probes every file on every scan."""
+        mock_get_codec.return_value = 'h264'
+        
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.dict(os.environ, {convert_videos.CODEC_CACHE_ENV_VAR: '0'}):
+            (Path(temp_dir) / "video.mp4").write_bytes(b'x' * 10)
+            self._scan(temp_dir)
+            self._scan(temp_dir)
+            
+            self.assertEqual(mock_get_codec.call_count, 2)
+            self.assertFalse(convert_videos.get_codec_cache_path().exists())
+    
+    @patch('convert_videos.get_codec')
+    def test_codec_cache_can_be_skipped_per_scan(self, mock_get_codec):
+        """Test that use_codec_cache=False probes every file and doesn't create the cache."""
+        mock_get_codec.return_value = 'h264'
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "video.mp4").write_bytes(b'x' * 10)
+            convert_videos.find_eligible_files(temp_dir, min_size_bytes=1, use_codec_cache=False)
+            convert_videos.find_eligible_files(temp_dir, min_size_bytes=1, use_codec_cache=False)
+            
+            self.assertEqual(mock_get_codec.call_count, 2)
+            self.assertFalse(convert_videos.get_codec_cache_path().exists())
 
 
 class TestValidateAndFinalize(unittest.TestCase):
@@ -231,6 +424,45 @@ class TestValidateAndFinalize(unittest.TestCase):
             self.assertFalse(result)
             self.assertTrue(final_output.exists())  # Output still created
             self.assertFalse(input_file.exists())  # Original renamed to .fail
+    
+    @patch('convert_videos.get_duration')
+    def test_validate_and_finalize_fractional_mismatch(self, mock_get_duration):
+        """Test that durations are compared unrounded."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.mp4"
+            temp_output = Path(temp_dir) / "output.mkv.temp"
+            final_output = Path(temp_dir) / "output.mkv"
+            
+            input_file.write_bytes(b'input data')
+            temp_output.write_bytes(b'output data')
+            
+            # Both round down to 100 seconds, but 1.8 seconds are missing
+            mock_get_duration.side_effect = lambda path, config=None: 101.9 if 'input' in str(path) else 100.1
+            
+            result = convert_videos.validate_and_finalize(
+                input_file, temp_output, final_output, preserve_original=False
+            )
+            
+            self.assertFalse(result)
+    
+    @unittest.skipUnless(hasattr(os, 'posix_fadvise'), 'posix_fadvise not available')
+    @patch('convert_videos.os.posix_fadvise')
+    @patch('convert_videos.get_duration', return_value=100)
+    def test_validate_and_finalize_drops_page_cache(self, mock_duration, mock_fadvise):
+        """Test that the converted files are evicted from the page cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.mp4"
+            temp_output = Path(temp_dir) / "output.mkv.temp"
+            final_output = Path(temp_dir) / "output.mkv"
+            input_file.write_bytes(b'input')
+            temp_output.write_bytes(b'output')
+            
+            result = convert_videos.validate_and_finalize(input_file, temp_output, final_output)
+            
+            self.assertTrue(result)
+            self.assertEqual(mock_fadvise.call_count, 2)
+            for call in mock_fadvise.call_args_list:
+                self.assertEqual(call.args[1:], (0, 0, os.POSIX_FADV_DONTNEED))
 
 
 class TestConvertFile(unittest.TestCase):
@@ -284,6 +516,167 @@ class TestConvertFile(unittest.TestCase):
             
             self.assertTrue(result)
 
+    @patch('convert_videos.validate_and_finalize', return_value=True)
+    @patch('subprocess_utils.run_command')
+    def test_convert_file_skips_claimed_output_name(self, mock_run, mock_validate):
+        """Test that an output name claimed by another conversion is not reused."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            # Another conversion of a same-named file is in progress
+            (Path(temp_dir) / "test.converted.mkv.temp").write_bytes(b'')
+            
+            result = convert_videos.convert_file(input_file)
+            
+            self.assertTrue(result)
+            temp_output = mock_validate.call_args.args[1]
+            self.assertEqual(temp_output.name, "test.converted.1.mkv.temp")
+    
+    @patch('subprocess_utils.run_command')
+    def test_convert_file_removes_claimed_temp_on_error(self, mock_run):
+        """Test that the claimed temp file is removed if the conversion raises."""
+        mock_run.side_effect = InterruptedError("Operation cancelled by user")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            
+            with self.assertRaises(InterruptedError):
+                convert_videos.convert_file(input_file)
+            
+            self.assertEqual(list(Path(temp_dir).glob("*.temp")), [])
+    
+    @patch('subprocess_utils.run_command')
+    def test_convert_file_unwritable_directory(self, mock_run):
+        """Test that a temp file that can't be created fails only this conversion."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            
+            with patch('convert_videos.open', side_effect=PermissionError(13, "Permission denied"), create=True):
+                result = convert_videos.convert_file(input_file)
+            
+            self.assertFalse(result)
+            mock_run.assert_not_called()
+    
+    @patch('convert_videos.detect_hevc_encoder', return_value='nvenc_hevc')
+    @patch('convert_videos.validate_and_finalize', return_value=True)
+    @patch('subprocess_utils.run_command')
+    def test_convert_file_auto_encoder(self, mock_run, mock_validate, mock_detect):
+        """Test that the auto encoder uses the detected encoder with a mapped preset."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            
+            result = convert_videos.convert_file(
+                input_file,
+                output_config={'format': 'mkv', 'encoder': 'auto', 'preset': 'veryslow', 'quality': 24},
+                dependency_config={'handbrake': '/opt/HandBrakeCLI'})
+            
+            self.assertTrue(result)
+            mock_detect.assert_called_once_with('/opt/HandBrakeCLI')
+            cmd = mock_run.call_args.args[0]
+            self.assertEqual(cmd[cmd.index('-e') + 1], 'nvenc_h265')
+            self.assertEqual(cmd[cmd.index('--encoder-preset') + 1], 'slow')
+            self.assertNotIn('--enable-hw-decoding', cmd)
+    
+    @patch('convert_videos.detect_hevc_encoder')
+    def test_convert_file_auto_encoder_dry_run(self, mock_detect):
+        """Test that a dry run doesn't probe HandBrakeCLI for the auto encoder."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            
+            result = convert_videos.convert_file(
+                input_file, dry_run=True,
+                output_config={'format': 'mkv', 'encoder': 'auto', 'preset': 'medium', 'quality': 24})
+            
+            self.assertTrue(result)
+            mock_detect.assert_not_called()
+    
+    @patch('convert_videos.validate_and_finalize', return_value=True)
+    @patch('subprocess_utils.run_command')
+    def test_convert_file_nvenc_hw_decoding(self, mock_run, mock_validate):
+        """Test that NVDEC decoding is only requested when hw_decoding is enabled."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            
+            convert_videos.convert_file(
+                input_file,
+                output_config={'format': 'mkv', 'encoder': 'nvenc_hevc', 'preset': 'slow', 'quality': 24,
+                               'hw_decoding': True})
+            
+            cmd = mock_run.call_args.args[0]
+            self.assertEqual(cmd[cmd.index('--enable-hw-decoding') + 1], 'nvdec')
+    
+    @patch('convert_videos._HANDBRAKE_RUN_KWARGS', {})
+    @patch('convert_videos._HANDBRAKE_PREFIX', ('nice', '-n', '10'))
+    @patch('convert_videos.validate_and_finalize', return_value=True)
+    @patch('subprocess_utils.run_command')
+    def test_convert_file_runs_handbrake_with_priority_prefix(self, mock_run, mock_validate):
+        """Test that HandBrakeCLI is started once, behind the priority prefix."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "test.mp4"
+            input_file.write_bytes(b'test data')
+            
+            result = convert_videos.convert_file(input_file)
+            
+            self.assertTrue(result)
+            mock_run.assert_called_once()
+            cmd = mock_run.call_args.args[0]
+            self.assertEqual(cmd[:4], ['nice', '-n', '10', 'HandBrakeCLI'])
+
+
+class TestDetectHevcEncoder(unittest.TestCase):
+    """Test picking the encoder for encoder: 'auto'."""
+    
+    def setUp(self):
+        convert_videos.detect_hevc_encoder.cache_clear()
+    
+    def tearDown(self):
+        convert_videos.detect_hevc_encoder.cache_clear()
+    
+    @staticmethod
+    def _write_help(help_text):
+        """Make a mocked run_command write help_text to the stdout it is given."""
+        def run_command(command_args, **kwargs):
+            kwargs['stdout'].write(help_text)
+            kwargs['stdout'].flush()
+        return run_command
+    
+    @patch('subprocess_utils.run_command')
+    def test_detect_hevc_encoder_nvenc(self, mock_run):
+        """Test that NVENC is used when HandBrakeCLI lists it."""
+        mock_run.side_effect = self._write_help("-e, --encoder <string>\n  x265\n  nvenc_h265\n")
+        
+        self.assertEqual(convert_videos.detect_hevc_encoder('HandBrakeCLI'), 'nvenc_hevc')
+        # The result is cached per HandBrakeCLI path
+        self.assertEqual(convert_videos.detect_hevc_encoder('HandBrakeCLI'), 'nvenc_hevc')
+        mock_run.assert_called_once()
+    
+    @patch('subprocess_utils.run_command')
+    def test_detect_hevc_encoder_software(self, mock_run):
+        """Test that x265 is used when no NVENC encoder is listed."""
+        mock_run.side_effect = self._write_help("-e, --encoder <string>\n  x265\n")
+        
+        self.assertEqual(convert_videos.detect_hevc_encoder('HandBrakeCLI'), 'x265_10bit')
+    
+    @patch('subprocess_utils.run_command')
+    def test_detect_hevc_encoder_missing_handbrake(self, mock_run):
+        """Test that x265 is used when HandBrakeCLI can't be run."""
+        mock_run.side_effect = FileNotFoundError("HandBrakeCLI")
+        
+        self.assertEqual(convert_videos.detect_hevc_encoder('HandBrakeCLI'), 'x265_10bit')
+    
+    def test_detect_hevc_encoder_does_not_log_help_text(self):
+        """Test that the probed help text isn't written to the log."""
+        # Any executable that prints help for --help will do
+        with self.assertLogs(level='INFO') as logs:
+            encoder = convert_videos.detect_hevc_encoder(sys.executable)
+        
+        self.assertEqual(encoder, 'x265_10bit')
+        self.assertFalse(any('Command stdout' in line or 'Command stderr' in line for line in logs.output))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@ Unit tests for convert_videos_cli.py
 """
 
 import sys
+import threading
 import unittest
 from unittest.mock import patch
 
@@ -54,6 +55,29 @@ class TestConvertVideosCLI(unittest.TestCase):
         # Verify files were searched for
         mock_find_files.assert_called_once()
     
+    @patch('convert_videos_cli.convert_videos.find_eligible_files', return_value=[])
+    @patch('convert_videos_cli.dependencies_utils.validate_dependencies', return_value=True)
+    @patch('convert_videos_cli.configuration_manager.load_config')
+    @patch('convert_videos_cli.logging_utils.setup_logging')
+    def test_main_with_no_codec_cache(self, mock_logging, mock_config, mock_validate, mock_find_files):
+        """Test that --no-codec-cache disables the codec cache for the scan."""
+        mock_config.return_value = ({
+            'directory': '/test/dir',
+            'dry_run': False,
+            'loop': False,
+            'remove_original_files': False,
+            'min_file_size': 1000000,
+            'output': {'directory': '/output'},
+            'dependencies': {},
+            'logging': {'log_file': None}
+        }, [])
+        
+        test_args = ['convert_videos_cli.py', '--no-codec-cache', '/test/dir']
+        with patch.object(sys, 'argv', test_args):
+            convert_videos_cli.main()
+        
+        self.assertIs(mock_find_files.call_args.kwargs['use_codec_cache'], False)
+    
     @patch('convert_videos_cli.time.sleep')
     @patch('convert_videos_cli.convert_videos.convert_file')
     @patch('convert_videos_cli.convert_videos.find_eligible_files')
@@ -157,6 +181,127 @@ class TestConvertVideosCLI(unittest.TestCase):
         # Should have called sleep (attempted to loop)
         mock_sleep.assert_called()
     
+    @patch('convert_videos_cli.time.monotonic')
+    @patch('convert_videos_cli.time.sleep')
+    @patch('convert_videos_cli.convert_videos.convert_file')
+    @patch('convert_videos_cli.convert_videos.find_eligible_files')
+    @patch('convert_videos_cli.dependencies_utils.validate_dependencies')
+    @patch('convert_videos_cli.configuration_manager.load_config')
+    @patch('convert_videos_cli.logging_utils.setup_logging')
+    def test_main_loop_mode_counts_conversion_time(self, mock_logging, mock_config, mock_validate,
+                                                   mock_find_files, mock_convert, mock_sleep, mock_monotonic):
+        """Test that loop mode only waits for the rest of the scan interval."""
+        mock_config.return_value = ({
+            'directory': '/test/dir',
+            'dry_run': False,
+            'loop': True,
+            'remove_original_files': False,
+            'min_file_size': 1000000,
+            'output': {'directory': '/output'},
+            'dependencies': {},
+            'logging': {'log_file': None}
+        }, [])
+        
+        mock_validate.return_value = True
+        # The first batch converts in 10 minutes, the second takes longer than the interval
+        mock_find_files.side_effect = [['/test/dir/a.mkv'], ['/test/dir/b.mkv'], KeyboardInterrupt("Stop loop")]
+        mock_monotonic.side_effect = [0, 600, 1000, 5000, 5000]
+        
+        test_args = ['convert_videos_cli.py', '--loop', '/test/dir']
+        with patch.object(sys, 'argv', test_args):
+            with self.assertRaises(KeyboardInterrupt):
+                convert_videos_cli.main()
+        
+        mock_sleep.assert_called_once_with(convert_videos_cli.LOOP_SCAN_INTERVAL_SECONDS - 600)
+    
+    @patch('convert_videos_cli.convert_videos.convert_file')
+    @patch('convert_videos_cli.convert_videos.find_eligible_files')
+    @patch('convert_videos_cli.dependencies_utils.validate_dependencies', return_value=True)
+    @patch('convert_videos_cli.configuration_manager.load_config')
+    @patch('convert_videos_cli.logging_utils.setup_logging')
+    def test_main_logs_conversion_summary(self, mock_logging, mock_config, mock_validate,
+                                          mock_find_files, mock_convert):
+        """Test that the results of a scan's conversions are summarized."""
+        mock_config.return_value = ({
+            'directory': '/test/dir',
+            'dry_run': False,
+            'loop': False,
+            'remove_original_files': False,
+            'min_file_size': 1000000,
+            'output': {'directory': '/output'},
+            'dependencies': {},
+            'logging': {'log_file': None}
+        }, [])
+        mock_find_files.return_value = ['/test/dir/a.mkv', '/test/dir/b.mkv']
+        mock_convert.side_effect = lambda file, **kwargs: file.endswith('a.mkv')
+        
+        test_args = ['convert_videos_cli.py', '/test/dir']
+        with patch.object(sys, 'argv', test_args), self.assertLogs('convert_videos_cli', level='INFO') as logs:
+            convert_videos_cli.main()
+        
+        self.assertIn('Converted 1 of 2 files', '\n'.join(logs.output))
+        self.assertIn('WARNING:convert_videos_cli:  Failed: /test/dir/b.mkv', logs.output)
+    
+    @patch('convert_videos_cli.convert_videos.convert_file', return_value=True)
+    @patch('convert_videos_cli.convert_videos.find_eligible_files')
+    @patch('convert_videos_cli.dependencies_utils.validate_dependencies', return_value=True)
+    @patch('convert_videos_cli.configuration_manager.load_config')
+    @patch('convert_videos_cli.logging_utils.setup_logging')
+    def test_main_dry_run_summary(self, mock_logging, mock_config, mock_validate,
+                                  mock_find_files, mock_convert):
+        """Test that a dry run doesn't report its files as converted."""
+        mock_config.return_value = ({
+            'directory': '/test/dir',
+            'dry_run': True,
+            'loop': False,
+            'remove_original_files': False,
+            'min_file_size': 1000000,
+            'output': {'directory': '/output'},
+            'dependencies': {},
+            'logging': {'log_file': None}
+        }, [])
+        mock_find_files.return_value = ['/test/dir/a.mkv', '/test/dir/b.mkv']
+        
+        test_args = ['convert_videos_cli.py', '--dry-run', '/test/dir']
+        with patch.object(sys, 'argv', test_args), self.assertLogs('convert_videos_cli', level='INFO') as logs:
+            convert_videos_cli.main()
+        
+        output = '\n'.join(logs.output)
+        self.assertIn('[Dry Run] Would convert 2 files', output)
+        self.assertNotIn('Converted', output)
+    
+    @patch('convert_videos_cli.convert_videos.convert_file')
+    @patch('convert_videos_cli.convert_videos.find_eligible_files')
+    @patch('convert_videos_cli.dependencies_utils.validate_dependencies')
+    @patch('convert_videos_cli.configuration_manager.load_config')
+    @patch('convert_videos_cli.logging_utils.setup_logging')
+    def test_main_converts_files_in_parallel(self, mock_logging, mock_config, mock_validate,
+                                             mock_find_files, mock_convert):
+        """Test that files are converted concurrently when jobs > 1."""
+        mock_config.return_value = ({
+            'directory': '/test/dir',
+            'dry_run': False,
+            'loop': False,
+            'jobs': 2,
+            'remove_original_files': False,
+            'min_file_size': 1000000,
+            'output': {'directory': '/output'},
+            'dependencies': {},
+            'logging': {'log_file': None}
+        }, [])
+        mock_validate.return_value = True
+        mock_find_files.return_value = ['/test/dir/a.mkv', '/test/dir/b.mkv']
+        barrier = threading.Barrier(2, timeout=5)
+        # Both conversions must be running at once to pass the barrier
+        mock_convert.side_effect = lambda file, **kwargs: barrier.wait() is not None
+        
+        test_args = ['convert_videos_cli.py', '--jobs', '2', '/test/dir']
+        with patch.object(sys, 'argv', test_args):
+            convert_videos_cli.main()
+        
+        self.assertEqual(sorted(call.args[0] for call in mock_convert.call_args_list),
+                         ['/test/dir/a.mkv', '/test/dir/b.mkv'])
+    
     @patch('convert_videos_cli.configuration_manager.load_config')
     @patch('convert_videos_cli.logging_utils.setup_logging')
     def test_main_with_validation_errors(self, mock_logging, mock_config):
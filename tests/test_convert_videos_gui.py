@@ -3,7 +3,14 @@
 Unit tests for convert_videos_gui.py
 """
 
+import os
+import tempfile
 import unittest
+from unittest.mock import MagicMock
+
+import yaml
+
+import configuration_manager
 
 # Import the GUI module (but don't run GUI components)
 try:
@@ -100,5 +107,51 @@ class TestVideoConverterGUIHelpers(unittest.TestCase):
         self.assertEqual(VideoConverterGUI.format_size(int(1.5 * 1024 ** 4)), "1.50 TB")
 
 
+@unittest.skipIf(not GUI_AVAILABLE, "GUI module not available (tkinter missing)")
+class TestVideoConverterGUIConfig(unittest.TestCase):
+    """Test building the configuration from the GUI."""
+    
+    @staticmethod
+    def _make_gui(config):
+        """Create a GUI instance with mocked widgets, without a Tk root."""
+        gui = VideoConverterGUI.__new__(VideoConverterGUI)
+        gui.config = config
+        values = {
+            'dir_entry': config['directory'],
+            'min_size_entry': '1GB',
+            'format_var': 'mkv',
+            'encoder_var': 'nvenc_hevc',
+            'preset_var': 'slow',
+            'quality_entry': '24',
+            'handbrake_entry': 'HandBrakeCLI',
+            'ffprobe_entry': 'ffprobe',
+            'ffmpeg_entry': 'ffmpeg',
+            'remove_original_var': False,
+            'dry_run_var': False,
+        }
+        for name, value in values.items():
+            setattr(gui, name, MagicMock(**{'get.return_value': value}))
+        return gui
+    
+    def test_generate_config_round_trip_keeps_settings_not_in_gui(self):
+        """Test that saving from the GUI keeps jobs and hw_decoding."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_path = os.path.join(temp_dir, 'config.yaml')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                yaml.dump({'directory': temp_dir, 'jobs': 4,
+                           'output': {'encoder': 'nvenc_hevc', 'hw_decoding': True}}, f)
+            config, errors = configuration_manager.load_config(config_path)
+            self.assertEqual(errors, [])
+            
+            generated = self._make_gui(config).generate_config()
+            with open(config_path, 'w', encoding='utf-8') as f:
+                yaml.dump(generated, f, default_flow_style=False, sort_keys=False)
+            reloaded, errors = configuration_manager.load_config(config_path)
+            
+            self.assertEqual(errors, [])
+            self.assertEqual(reloaded['jobs'], 4)
+            self.assertIs(reloaded['output']['hw_decoding'], True)
+
+
 if __name__ == '__main__':
     unittest.main()
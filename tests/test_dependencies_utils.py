@@ -1,12 +1,15 @@
 """
 Unit tests for dependencies_utils module.
 """
+import io
 import os
 import platform
 import shutil
 import subprocess
+import sys
 import tarfile
 import tempfile
+import threading
 import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch, call
@@ -123,6 +126,60 @@ class TestSafeExtractTar:
             with pytest.raises(RuntimeError, match="Attempted path traversal"):
                 dependencies_utils._safe_extract_tar(tar, str(extract_dir))
 
+    @pytest.mark.skipif(dependencies_utils.TAR_EXTRACT_FILTER is None,
+                        reason="tarfile extraction filters not available")
+    def test_safe_extract_tar_symlink_escape(self, tmp_path):
+        """Test that a symlink pointing outside the extraction directory is blocked."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        archive_path = tmp_path / "malicious.tar"
+
+        with tarfile.open(archive_path, "w") as tar:
+            link = tarfile.TarInfo("link")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "../../etc/passwd"
+            tar.addfile(link)
+
+        with tarfile.open(archive_path, "r:*") as tar:
+            with pytest.raises(RuntimeError, match="Unsafe member"):
+                dependencies_utils._safe_extract_tar(tar, str(extract_dir))
+        assert not (extract_dir / "link").exists()
+
+    def test_safe_extract_tar_errors_without_filter_support(self, tmp_path):
+        """Test that extraction errors propagate on Pythons without tarfile.FilterError."""
+        archive_path = tmp_path / "archive.tar"
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        with tarfile.open(archive_path, "w") as tar:
+            tar.add(test_file, arcname="test.txt")
+
+        with patch.object(dependencies_utils, '_TAR_FILTER_ERROR', ()), \
+                patch.object(dependencies_utils, 'TAR_EXTRACT_FILTER', None), \
+                patch.object(tarfile.TarFile, 'extract', side_effect=OSError("disk full")), \
+                tarfile.open(archive_path, "r:*") as tar:
+            with pytest.raises(OSError, match="disk full"):
+                dependencies_utils._safe_extract_tar(tar, str(tmp_path / "extract"))
+
+    def test_safe_extract_tar_member_names(self, tmp_path):
+        """Test that only members with the requested names are extracted."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        archive_path = tmp_path / "ffmpeg.tar"
+
+        with tarfile.open(archive_path, "w") as tar:
+            for name in ("ffmpeg-static/ffmpeg", "ffmpeg-static/ffprobe", "ffmpeg-static/manpages/ffmpeg.txt"):
+                data = name.encode()
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        with tarfile.open(archive_path, "r:*") as tar:
+            dependencies_utils._safe_extract_tar(tar, str(extract_dir), member_names={"ffmpeg"})
+
+        assert (extract_dir / "ffmpeg-static" / "ffmpeg").exists()
+        assert not (extract_dir / "ffmpeg-static" / "ffprobe").exists()
+        assert not (extract_dir / "ffmpeg-static" / "manpages").exists()
+
 
 class TestSafeExtractZip:
     """Test the _safe_extract_zip function for path traversal prevention."""
@@ -151,6 +208,24 @@ class TestSafeExtractZip:
         assert extracted_file.exists()
         assert extracted_file.read_text() == "test content"
 
+    def test_safe_extract_zip_member_names(self, tmp_path):
+        """Test that only members with the requested names are extracted."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        archive_path = tmp_path / "ffmpeg.zip"
+
+        with zipfile.ZipFile(archive_path, "w") as zip_ref:
+            zip_ref.writestr("ffmpeg-6.1-essentials_build/bin/ffmpeg.exe", "ffmpeg")
+            zip_ref.writestr("ffmpeg-6.1-essentials_build/bin/ffplay.exe", "ffplay")
+            zip_ref.writestr("ffmpeg-6.1-essentials_build/doc/ffmpeg.html", "doc")
+
+        with zipfile.ZipFile(archive_path, "r") as zip_ref:
+            dependencies_utils._safe_extract_zip(zip_ref, str(extract_dir), member_names={"ffmpeg.exe"})
+
+        assert (extract_dir / "ffmpeg-6.1-essentials_build" / "bin" / "ffmpeg.exe").read_text() == "ffmpeg"
+        assert not (extract_dir / "ffmpeg-6.1-essentials_build" / "bin" / "ffplay.exe").exists()
+        assert not (extract_dir / "ffmpeg-6.1-essentials_build" / "doc").exists()
+
     def test_safe_extract_zip_path_traversal_attempt(self, tmp_path):
         """Test that path traversal in zip archives is detected and blocked."""
         archive_dir = tmp_path / "archive"
@@ -176,34 +251,387 @@ class TestSafeExtractZip:
 class TestDownloadFile:
     """Test the download_file function."""
 
-    @patch('dependencies_utils.shutil.copyfileobj')
-    @patch('dependencies_utils.urllib.request.urlopen')
-    def test_download_file_success(self, mock_urlopen, mock_copyfileobj, tmp_path):
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_success(self, mock_http, tmp_path):
         """Test successful file download."""
         dest_path = tmp_path / "downloaded.txt"
 
-        # Mock the response context manager
         mock_response = MagicMock()
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        mock_response.status = 200
+        mock_response.read.side_effect = [b"file content", b""]
+        mock_http.request.return_value = mock_response
+
+        result = dependencies_utils.download_file("http://example.com/file.txt", dest_path)
+
+        assert result is True
+        assert dest_path.read_bytes() == b"file content"
+        mock_http.request.assert_called_once_with(
+            'GET', "http://example.com/file.txt", preload_content=False)
+        mock_response.release_conn.assert_called_once()
+        mock_response.read.assert_called_with(dependencies_utils.DOWNLOAD_BUFFER_SIZE)
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_resumes_interrupted_download(self, mock_http, tmp_path):
+        """Test that an interrupted download is resumed with a Range request."""
+        import urllib3
+        dest_path = tmp_path / "downloaded.txt"
+
+        first_response = MagicMock()
+        first_response.status = 200
+        first_response.headers = {'ETag': '"v1"'}
+        first_response.read.side_effect = [b"file ", urllib3.exceptions.ProtocolError("Connection broken")]
+        resumed_response = MagicMock()
+        resumed_response.status = 206
+        resumed_response.headers = {}
+        resumed_response.read.side_effect = [b"content", b""]
+        mock_http.request.side_effect = [first_response, resumed_response]
+
+        result = dependencies_utils.download_file("http://example.com/file.txt", dest_path)
+
+        assert result is True
+        assert dest_path.read_bytes() == b"file content"
+        assert mock_http.request.call_args.kwargs['headers'] == {'Range': 'bytes=5-', 'If-Range': '"v1"'}
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_restarts_when_range_ignored(self, mock_http, tmp_path):
+        """Test that a full response to a resume request replaces the partial data."""
+        import urllib3
+        dest_path = tmp_path / "downloaded.txt"
+
+        first_response = MagicMock()
+        first_response.status = 200
+        first_response.headers = {}
+        first_response.read.side_effect = [b"stale", urllib3.exceptions.ProtocolError("Connection broken")]
+        full_response = MagicMock()
+        full_response.status = 200
+        full_response.headers = {}
+        full_response.read.side_effect = [b"file content", b""]
+        mock_http.request.side_effect = [first_response, full_response]
 
         result = dependencies_utils.download_file("http://example.com/file.txt", dest_path)
 
         assert result is True
-        mock_urlopen.assert_called_once()
-        mock_copyfileobj.assert_called_once()
+        assert dest_path.read_bytes() == b"file content"
 
-    @patch('dependencies_utils.urllib.request.urlopen')
-    def test_download_file_url_error(self, mock_urlopen, tmp_path):
-        """Test download failure due to URL error."""
+    @patch('dependencies_utils.shutil.disk_usage')
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_insufficient_disk_space(self, mock_http, mock_disk_usage, tmp_path):
+        """Test that a download larger than the free space fails before writing."""
         dest_path = tmp_path / "downloaded.txt"
 
-        # Mock URL error
-        import urllib.error
-        mock_urlopen.side_effect = urllib.error.URLError("Connection failed")
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.headers = {'Content-Length': '1000'}
+        mock_http.request.return_value = mock_response
+        mock_disk_usage.return_value = MagicMock(free=999)
 
         result = dependencies_utils.download_file("http://example.com/file.txt", dest_path)
 
         assert result is False
+        assert not dest_path.exists()
+        assert not (tmp_path / "downloaded.txt.part").exists()
+        mock_response.read.assert_not_called()
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_url_error(self, mock_http, tmp_path):
+        """Test download failure due to connection error."""
+        dest_path = tmp_path / "downloaded.txt"
+
+        import urllib3
+        mock_http.request.side_effect = urllib3.exceptions.MaxRetryError(
+            None, "http://example.com/file.txt", "Connection failed")
+
+        result = dependencies_utils.download_file("http://example.com/file.txt", dest_path)
+
+        assert result is False
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_http_error_status(self, mock_http, tmp_path):
+        """Test download failure when the server returns a non-200 status."""
+        dest_path = tmp_path / "downloaded.txt"
+
+        mock_response = MagicMock()
+        mock_response.status = 404
+        mock_response.reason = "Not Found"
+        mock_http.request.return_value = mock_response
+
+        result = dependencies_utils.download_file("http://example.com/file.txt", dest_path)
+
+        assert result is False
+        assert not dest_path.exists()
+        mock_response.release_conn.assert_called_once()
+
+
+class TestDownloadCache:
+    """Test the persistent download cache used by download_file."""
+
+    URL = "http://example.com/archive.zip"
+
+    @staticmethod
+    def _response(status=200, content=b"", headers=None):
+        response = MagicMock()
+        response.status = status
+        response.headers = headers or {}
+        stream = io.BytesIO(content)
+        response.read.side_effect = stream.read
+        return response
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_populates_cache(self, mock_http, tmp_path):
+        """Test that a fresh download is stored in the cache."""
+        cache_dir = tmp_path / "cache"
+        mock_http.request.return_value = self._response(content=b"archive")
+
+        result = dependencies_utils.download_file(self.URL, tmp_path / "archive.zip", cache_dir)
+
+        assert result is True
+        cached_path = dependencies_utils._get_cached_download_path(self.URL, cache_dir)
+        assert cached_path.read_bytes() == b"archive"
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_uses_valid_cache(self, mock_http, tmp_path):
+        """Test that a cached copy matching Content-Length skips the download."""
+        cache_dir = tmp_path / "cache"
+        cached_path = dependencies_utils._get_cached_download_path(self.URL, cache_dir)
+        cached_path.parent.mkdir(parents=True)
+        cached_path.write_bytes(b"archive")
+        mock_http.request.return_value = self._response(headers={'Content-Length': '7'})
+
+        dest_path = tmp_path / "archive.zip"
+        result = dependencies_utils.download_file(self.URL, dest_path, cache_dir)
+
+        assert result is True
+        assert dest_path.read_bytes() == b"archive"
+        mock_http.request.assert_called_once_with('HEAD', self.URL)
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_refreshes_outdated_cache(self, mock_http, tmp_path):
+        """Test that a cached copy with a different size is downloaded again."""
+        cache_dir = tmp_path / "cache"
+        cached_path = dependencies_utils._get_cached_download_path(self.URL, cache_dir)
+        cached_path.parent.mkdir(parents=True)
+        cached_path.write_bytes(b"old")
+        mock_http.request.side_effect = [
+            self._response(headers={'Content-Length': '11'}),
+            self._response(content=b"new archive"),
+        ]
+
+        dest_path = tmp_path / "archive.zip"
+        result = dependencies_utils.download_file(self.URL, dest_path, cache_dir)
+
+        assert result is True
+        assert dest_path.read_bytes() == b"new archive"
+        assert cached_path.read_bytes() == b"new archive"
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_records_etag(self, mock_http, tmp_path):
+        """Test that the ETag of a fresh download is stored next to the cached copy."""
+        cache_dir = tmp_path / "cache"
+        mock_http.request.return_value = self._response(content=b"archive", headers={'ETag': '"v1"'})
+
+        dependencies_utils.download_file(self.URL, tmp_path / "archive.zip", cache_dir)
+
+        cached_path = dependencies_utils._get_cached_download_path(self.URL, cache_dir)
+        assert dependencies_utils._get_etag_path(cached_path).read_text() == '"v1"'
+        assert not (tmp_path / "archive.zip.part").exists()
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_refreshes_cache_on_etag_change(self, mock_http, tmp_path):
+        """Test that a same-size cached copy with a different ETag is downloaded again."""
+        cache_dir = tmp_path / "cache"
+        cached_path = dependencies_utils._get_cached_download_path(self.URL, cache_dir)
+        cached_path.parent.mkdir(parents=True)
+        cached_path.write_bytes(b"archive")
+        dependencies_utils._get_etag_path(cached_path).write_text('"v1"')
+        mock_http.request.side_effect = [
+            self._response(headers={'Content-Length': '7', 'ETag': '"v2"'}),
+            self._response(content=b"ARCHIVE", headers={'ETag': '"v2"'}),
+        ]
+
+        dest_path = tmp_path / "archive.zip"
+        result = dependencies_utils.download_file(self.URL, dest_path, cache_dir)
+
+        assert result is True
+        assert dest_path.read_bytes() == b"ARCHIVE"
+        assert dependencies_utils._get_etag_path(cached_path).read_text() == '"v2"'
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_file_failure_leaves_no_partial_file(self, mock_http, tmp_path):
+        """Test that an interrupted download leaves neither the file nor a .part file."""
+        import urllib3
+        response = self._response()
+        response.read.side_effect = urllib3.exceptions.ProtocolError("Connection broken")
+        mock_http.request.return_value = response
+
+        dest_path = tmp_path / "archive.zip"
+        result = dependencies_utils.download_file(self.URL, dest_path)
+
+        assert result is False
+        assert not dest_path.exists()
+        assert not (tmp_path / "archive.zip.part").exists()
+
+    def test_prune_download_cache_removes_unused_entries(self, tmp_path):
+        """Test that cache entries not used in this run are removed, whatever their mtime."""
+        cache_dir = tmp_path / "cache"
+        stale_entry = cache_dir / "stale"
+        used_entry = cache_dir / "used"
+        for entry in (stale_entry, used_entry):
+            entry.mkdir(parents=True)
+            (entry / "archive.zip").write_bytes(b"archive")
+        # A coarse-mtime filesystem can report a used entry as older than the run
+        os.utime(used_entry, (1000, 1000))
+
+        dependencies_utils._prune_download_cache(cache_dir, used_entries={"used"})
+
+        assert not stale_entry.exists()
+        assert used_entry.exists()
+
+    def test_prune_download_cache_keep_downloads(self, tmp_path):
+        """Test that CONVERT_VIDEOS_KEEP_DOWNLOADS=1 disables pruning."""
+        stale_entry = tmp_path / "cache" / "stale"
+        stale_entry.mkdir(parents=True)
+
+        with patch.dict(os.environ, {dependencies_utils.KEEP_DOWNLOADS_ENV_VAR: '1'}):
+            dependencies_utils._prune_download_cache(tmp_path / "cache", used_entries=set())
+
+        assert stale_entry.exists()
+
+    def test_cache_disabled_by_env_var(self, tmp_path):
+        """Test that CONVERT_VIDEOS_BUILD_CACHE=0 disables the cache."""
+        with patch.dict(os.environ, {dependencies_utils.DOWNLOAD_CACHE_ENV_VAR: '0'}):
+            assert dependencies_utils._get_cached_download_path(self.URL, tmp_path) is None
+
+
+class TestPrefetchReader:
+    """Test the background read-ahead used when extracting while downloading."""
+
+    def test_reads_all_data_in_order(self):
+        """Test that reads of any size return the source data in order."""
+        data = bytes(range(256)) * 100
+        with dependencies_utils._PrefetchReader(io.BytesIO(data), chunk_size=1000, max_chunks=2) as reader:
+            result = b''
+            while True:
+                chunk = reader.read(777)
+                if not chunk:
+                    break
+                result += chunk
+            assert reader.read(10) == b''
+
+        assert result == data
+
+    def test_propagates_source_errors(self):
+        """Test that an error reading the source is raised to the consumer."""
+        source = MagicMock()
+        source.read.side_effect = OSError("connection reset")
+
+        with dependencies_utils._PrefetchReader(source) as reader:
+            with pytest.raises(OSError, match="connection reset"):
+                reader.read(10)
+
+    def test_close_stops_producer_early(self):
+        """Test that closing before the source is exhausted doesn't block."""
+        source = io.BytesIO(b"x" * 10000)
+
+        with dependencies_utils._PrefetchReader(source, chunk_size=10, max_chunks=1) as reader:
+            assert reader.read(5) == b"xxxxx"
+
+        assert source.tell() < 10000
+
+
+class TestDownloadAndExtractTar:
+    """Test the download_and_extract_tar function."""
+
+    @staticmethod
+    def _make_tar_bytes(tmp_path, arcname):
+        source = tmp_path / "source.txt"
+        source.write_text("test content")
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:xz") as tar:
+            tar.add(source, arcname=arcname)
+        return buffer.getvalue()
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_and_extract_tar_success(self, mock_http, tmp_path):
+        """Test that the archive is extracted straight from the response stream."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+
+        stream = io.BytesIO(self._make_tar_bytes(tmp_path, "ffmpeg-static/ffmpeg"))
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.read.side_effect = stream.read
+        mock_http.request.return_value = mock_response
+
+        result = dependencies_utils.download_and_extract_tar(
+            "http://example.com/ffmpeg.tar.xz", str(extract_dir))
+
+        assert result is True
+        assert (extract_dir / "ffmpeg-static" / "ffmpeg").read_text() == "test content"
+        mock_response.release_conn.assert_called_once()
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_and_extract_tar_populates_cache(self, mock_http, tmp_path):
+        """Test that the streamed archive is also written to the cache."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        cache_dir = tmp_path / "cache"
+        url = "http://example.com/ffmpeg.tar.xz"
+
+        archive_bytes = self._make_tar_bytes(tmp_path, "ffmpeg-static/ffmpeg")
+        stream = io.BytesIO(archive_bytes)
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.headers = {'ETag': '"v1"'}
+        mock_response.read.side_effect = stream.read
+        mock_http.request.return_value = mock_response
+
+        result = dependencies_utils.download_and_extract_tar(url, str(extract_dir), cache_dir)
+
+        assert result is True
+        cached_path = dependencies_utils._get_cached_download_path(url, cache_dir)
+        assert cached_path.read_bytes() == archive_bytes
+        assert dependencies_utils._get_etag_path(cached_path).read_text() == '"v1"'
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_and_extract_tar_path_traversal(self, mock_http, tmp_path):
+        """Test that path traversal in a streamed archive is reported as failure."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+
+        stream = io.BytesIO(self._make_tar_bytes(tmp_path, "../../../etc/passwd"))
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.read.side_effect = stream.read
+        mock_http.request.return_value = mock_response
+
+        result = dependencies_utils.download_and_extract_tar(
+            "http://example.com/ffmpeg.tar.xz", str(extract_dir))
+
+        assert result is False
+
+    @patch('dependencies_utils._HTTP')
+    def test_download_and_extract_tar_failure_leaves_nothing(self, mock_http, tmp_path):
+        """Test that members extracted before a failure are not left in extract_to."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        source = tmp_path / "source.txt"
+        source.write_text("test content")
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:xz") as tar:
+            tar.add(source, arcname="ffmpeg-static/ffmpeg")
+            tar.add(source, arcname="../../../etc/passwd")
+
+        stream = io.BytesIO(buffer.getvalue())
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.read.side_effect = stream.read
+        mock_http.request.return_value = mock_response
+
+        result = dependencies_utils.download_and_extract_tar("http://example.com/ffmpeg.tar.xz", str(extract_dir))
+
+        assert result is False
+        assert list(extract_dir.iterdir()) == []
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["extract", "source.txt"]
 
 
 class TestExtractArchive:
@@ -255,6 +683,131 @@ class TestExtractArchive:
         assert extracted_file.exists()
         assert extracted_file.read_text() == "test content"
 
+    def test_extract_archive_tgz_uppercase_suffix(self, tmp_path):
+        """Test that tar suffix aliases are matched case-insensitively."""
+        archive_dir = tmp_path / "archive"
+        archive_dir.mkdir()
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+
+        archive_path = archive_dir / "TEST.TGZ"
+        test_file = archive_dir / "test.txt"
+        test_file.write_text("test content")
+
+        with tarfile.open(archive_path, "w:gz") as tar:
+            tar.add(test_file, arcname="test.txt")
+
+        dependencies_utils.extract_archive(str(archive_path), str(extract_dir))
+
+        assert (extract_dir / "test.txt").read_text() == "test content"
+
+    @pytest.mark.skipif(not (sys.platform.startswith('linux') and shutil.which('tar') and shutil.which('xz')),
+                        reason="system GNU tar and xz not available")
+    def test_extract_archive_tar_xz_system_tar(self, tmp_path):
+        """Test extracting a tar.xz archive with the system tar."""
+        archive_dir = tmp_path / "archive"
+        archive_dir.mkdir()
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+
+        archive_path = archive_dir / "test.tar.xz"
+        test_file = archive_dir / "test.txt"
+        test_file.write_text("test content")
+
+        with tarfile.open(archive_path, "w:xz") as tar:
+            tar.add(test_file, arcname="ffmpeg-static/test.txt")
+
+        with patch('dependencies_utils._safe_extract_tar') as mock_safe_extract:
+            dependencies_utils.extract_archive(str(archive_path), str(extract_dir))
+
+        mock_safe_extract.assert_not_called()
+        assert (extract_dir / "ffmpeg-static" / "test.txt").read_text() == "test content"
+
+    @pytest.mark.skipif(not (sys.platform.startswith('linux') and shutil.which('tar') and shutil.which('xz')),
+                        reason="system GNU tar and xz not available")
+    def test_extract_archive_tar_xz_system_tar_member_names(self, tmp_path):
+        """Test that the system tar only extracts the requested members."""
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        archive_path = tmp_path / "ffmpeg.tar.xz"
+
+        with tarfile.open(archive_path, "w:xz") as tar:
+            for name in ("ffmpeg-6.1-amd64-static/ffmpeg", "ffmpeg-6.1-amd64-static/ffprobe",
+                         "ffmpeg-6.1-amd64-static/manpages/ffmpeg.txt"):
+                data = name.encode()
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        dependencies_utils.extract_archive(str(archive_path), str(extract_dir),
+                                           member_names={"ffmpeg", "ffprobe"})
+
+        assert (extract_dir / "ffmpeg-6.1-amd64-static" / "ffmpeg").exists()
+        assert (extract_dir / "ffmpeg-6.1-amd64-static" / "ffprobe").exists()
+        assert not (extract_dir / "ffmpeg-6.1-amd64-static" / "manpages").exists()
+
+    @pytest.mark.skipif(not (sys.platform.startswith('linux') and shutil.which('tar') and shutil.which('xz')),
+                        reason="system GNU tar and xz not available")
+    def test_extract_archive_tar_xz_system_tar_missing_extract_dir(self, tmp_path):
+        """Test that the system tar extracts into a directory that doesn't exist yet."""
+        extract_dir = tmp_path / "extract"
+        archive_path = tmp_path / "test.tar.xz"
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+
+        with tarfile.open(archive_path, "w:xz") as tar:
+            tar.add(test_file, arcname="test.txt")
+
+        with patch('dependencies_utils._safe_extract_tar') as mock_safe_extract:
+            dependencies_utils.extract_archive(str(archive_path), str(extract_dir))
+
+        mock_safe_extract.assert_not_called()
+        assert (extract_dir / "test.txt").read_text() == "test content"
+
+    @pytest.mark.skipif(not (sys.platform.startswith('linux') and shutil.which('tar') and shutil.which('xz')),
+                        reason="system GNU tar and xz not available")
+    def test_extract_archive_tar_xz_system_tar_xz_path_with_spaces(self, tmp_path):
+        """Test that an xz path containing spaces is passed to tar intact."""
+        xz_dir = tmp_path / "xz tools"
+        xz_dir.mkdir()
+        xz_path = xz_dir / "xz"
+        xz_path.symlink_to(shutil.which('xz'))
+        tar_path = shutil.which('tar')
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        archive_path = tmp_path / "test.tar.xz"
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+
+        with tarfile.open(archive_path, "w:xz") as tar:
+            tar.add(test_file, arcname="test.txt")
+
+        with patch('dependencies_utils.shutil.which', side_effect=lambda name: str(xz_path) if name == 'xz' else tar_path), \
+                patch('dependencies_utils._safe_extract_tar') as mock_safe_extract:
+            dependencies_utils.extract_archive(str(archive_path), str(extract_dir))
+
+        mock_safe_extract.assert_not_called()
+        assert (extract_dir / "test.txt").read_text() == "test content"
+
+    def test_extract_archive_tar_xz_without_system_tar(self, tmp_path):
+        """Test that tar.xz falls back to tarfile when the system tools are missing."""
+        archive_dir = tmp_path / "archive"
+        archive_dir.mkdir()
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+
+        archive_path = archive_dir / "test.tar.xz"
+        test_file = archive_dir / "test.txt"
+        test_file.write_text("test content")
+
+        with tarfile.open(archive_path, "w:xz") as tar:
+            tar.add(test_file, arcname="test.txt")
+
+        with patch('dependencies_utils.shutil.which', return_value=None):
+            dependencies_utils.extract_archive(str(archive_path), str(extract_dir))
+
+        assert (extract_dir / "test.txt").read_text() == "test content"
+
     def test_extract_archive_unsupported_format(self, tmp_path):
         """Test that unsupported archive formats raise ValueError."""
         extract_dir = tmp_path / "extract"
@@ -272,6 +825,50 @@ class TestExtractArchive:
             dependencies_utils.extract_archive("/path/to/file.flatpak", str(extract_dir))
 
 
+class TestFindExtractedBinary:
+    """Test the _find_extracted_binary function."""
+
+    def test_find_extracted_binary_known_layout(self, tmp_path):
+        """Test that the binary is found at its known archive location."""
+        binary = tmp_path / "ffmpeg-7.0.2-amd64-static" / "ffprobe"
+        binary.parent.mkdir()
+        binary.write_text("binary")
+
+        result = dependencies_utils._find_extracted_binary(tmp_path, "ffprobe", "linux")
+
+        assert result == binary
+
+    def test_find_extracted_binary_fallback_search(self, tmp_path):
+        """Test that an unexpected layout falls back to a recursive search."""
+        binary = tmp_path / "some" / "nested" / "bin" / "ffmpeg.exe"
+        binary.parent.mkdir(parents=True)
+        binary.write_text("binary")
+
+        result = dependencies_utils._find_extracted_binary(tmp_path, "ffmpeg.exe", "windows")
+
+        assert result == binary
+
+    def test_find_extracted_binary_ignores_directories(self, tmp_path):
+        """Test that a directory with the binary's name is not returned."""
+        (tmp_path / "ffmpeg").mkdir()
+
+        assert dependencies_utils._find_extracted_binary(tmp_path, "ffmpeg", "macos") is None
+
+    def test_find_extracted_binary_does_not_follow_directory_symlinks(self, tmp_path):
+        """Test that the fallback search does not descend into symlinked directories."""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "ffmpeg").write_text("binary")
+        extract_dir = tmp_path / "extract"
+        extract_dir.mkdir()
+        try:
+            (extract_dir / "link").symlink_to(outside, target_is_directory=True)
+        except OSError:
+            pytest.skip("Symlinks are not supported here")
+
+        assert dependencies_utils._find_extracted_binary(extract_dir, "ffmpeg", "macos") is None
+
+
 @pytest.mark.skipif(platform.system() != 'Darwin', reason="DMG extraction only works on macOS")
 class TestExtractDmg:
     """Test the extract_dmg function (macOS only)."""
@@ -407,3 +1004,176 @@ class TestCheckSingleDependency:
 
         assert valid is False
         assert error == "invalid"
+
+
+class TestCheckDependencies:
+    """Test the check_dependencies function."""
+
+    @patch('dependencies_utils.check_single_dependency')
+    def test_check_dependencies_runs_concurrently(self, mock_check):
+        """Test that the checks run at the same time and keep their order."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def check(command):
+            # All three checks must be running at once to pass the barrier
+            barrier.wait()
+            return (command != "broken", None if command != "broken" else "invalid")
+
+        mock_check.side_effect = check
+
+        results = dependencies_utils.check_dependencies(["ffprobe", "broken", "ffmpeg"])
+
+        assert results == [(True, None), (False, "invalid"), (True, None)]
+
+    @patch('dependencies_utils.check_single_dependency')
+    def test_validate_dependencies_reports_missing(self, mock_check):
+        """Test that validate_dependencies fails if any dependency is invalid."""
+        mock_check.side_effect = lambda command: (command != "/opt/HandBrakeCLI", None)
+
+        assert dependencies_utils.validate_dependencies(
+            {'ffprobe': 'ffprobe', 'ffmpeg': 'ffmpeg', 'handbrake': '/opt/HandBrakeCLI'}) is False
+        assert dependencies_utils.validate_dependencies(
+            {'ffprobe': 'ffprobe', 'ffmpeg': 'ffmpeg', 'handbrake': 'HandBrakeCLI'}) is True
+
+
+class TestDownloadFfmpegMacos:
+    """Test the macOS ffmpeg/ffprobe download path."""
+
+    @patch('dependencies_utils.get_platform', return_value='macos')
+    @patch('dependencies_utils.download_file')
+    def test_download_ffmpeg_macos_downloads_both(self, mock_download, mock_platform, tmp_path):
+        """Test that ffmpeg and ffprobe are each downloaded and extracted."""
+        tmpdir = tmp_path / "tmp"
+        tmpdir.mkdir()
+        download_dir = tmp_path / "deps"
+        download_dir.mkdir()
+
+        def fake_download(url, dest_path, cache_dir=None):
+            binary_name = 'ffprobe' if 'ffprobe' in url else 'ffmpeg'
+            with zipfile.ZipFile(dest_path, "w") as zip_ref:
+                zip_ref.writestr(binary_name, f"{binary_name} binary")
+            return True
+
+        mock_download.side_effect = fake_download
+
+        ffmpeg_bin, ffprobe_bin = dependencies_utils.download_ffmpeg(tmpdir, download_dir)
+
+        assert ffmpeg_bin == download_dir / "ffmpeg"
+        assert ffprobe_bin == download_dir / "ffprobe"
+        assert ffmpeg_bin.read_text() == "ffmpeg binary"
+        assert ffprobe_bin.read_text() == "ffprobe binary"
+        assert mock_download.call_count == 2
+
+
+class TestDownloadDependencies:
+    """Test the download_dependencies function."""
+
+    @patch('dependencies_utils.download_ffmpeg')
+    @patch('dependencies_utils.download_handbrake')
+    def test_download_dependencies_downloads_both(self, mock_handbrake, mock_ffmpeg, tmp_path):
+        """Test that HandBrakeCLI and ffmpeg/ffprobe are both downloaded."""
+        deps_dir = tmp_path / "deps"
+        handbrake = tmp_path / "HandBrakeCLI"
+        ffmpeg = tmp_path / "ffmpeg"
+        ffprobe = tmp_path / "ffprobe"
+        for binary in (handbrake, ffmpeg, ffprobe):
+            binary.write_text("binary")
+
+        mock_handbrake.return_value = handbrake
+        mock_ffmpeg.return_value = (ffmpeg, ffprobe)
+
+        result = dependencies_utils.download_dependencies(deps_dir)
+
+        assert result == (str(handbrake.resolve()), str(ffprobe.resolve()), str(ffmpeg.resolve()))
+        mock_handbrake.assert_called_once()
+        mock_ffmpeg.assert_called_once()
+
+    @patch('dependencies_utils.download_ffmpeg')
+    @patch('dependencies_utils.download_handbrake')
+    def test_download_dependencies_cache_is_opt_in(self, mock_handbrake, mock_ffmpeg, tmp_path):
+        """Test that archives are only cached when a cache directory is passed."""
+        deps_dir = tmp_path / "deps"
+        for binary in ("HandBrakeCLI", "ffmpeg", "ffprobe"):
+            (tmp_path / binary).write_text("binary")
+        mock_handbrake.return_value = tmp_path / "HandBrakeCLI"
+        mock_ffmpeg.return_value = (tmp_path / "ffmpeg", tmp_path / "ffprobe")
+
+        dependencies_utils.download_dependencies(deps_dir)
+        assert mock_handbrake.call_args.args[2] is None
+        assert mock_ffmpeg.call_args.args[2] is None
+
+        cache_dir = tmp_path / "cache"
+        dependencies_utils.download_dependencies(deps_dir, force_download=True, cache_dir=cache_dir)
+        assert mock_handbrake.call_args.args[2] == cache_dir
+        assert mock_ffmpeg.call_args.args[2] == cache_dir
+
+    @patch('dependencies_utils.download_ffmpeg')
+    @patch('dependencies_utils.download_handbrake')
+    def test_download_dependencies_prunes_unused_cache_entries(self, mock_handbrake, mock_ffmpeg, tmp_path):
+        """Test that only cache entries used by this run are kept."""
+        cache_dir = tmp_path / "cache"
+        used_path = dependencies_utils._get_cached_download_path("http://example.com/new.zip", cache_dir)
+        stale_path = dependencies_utils._get_cached_download_path("http://example.com/old.zip", cache_dir)
+        for path in (used_path, stale_path):
+            path.parent.mkdir(parents=True)
+            path.write_bytes(b"archive")
+        for binary in ("HandBrakeCLI", "ffmpeg", "ffprobe"):
+            (tmp_path / binary).write_text("binary")
+
+        def fake_handbrake(tmpdir, download_dir, cache_dir=None):
+            dependencies_utils._mark_cache_entry_used(used_path)
+            return tmp_path / "HandBrakeCLI"
+
+        mock_handbrake.side_effect = fake_handbrake
+        mock_ffmpeg.return_value = (tmp_path / "ffmpeg", tmp_path / "ffprobe")
+
+        dependencies_utils.download_dependencies(tmp_path / "deps", cache_dir=cache_dir)
+
+        assert used_path.exists()
+        assert not stale_path.parent.exists()
+
+    @patch('dependencies_utils.check_single_dependency', return_value=(True, None))
+    @patch('dependencies_utils.download_ffmpeg')
+    @patch('dependencies_utils.download_handbrake')
+    def test_download_dependencies_skips_existing(self, mock_handbrake, mock_ffmpeg, mock_check, tmp_path):
+        """Test that valid existing binaries are reused without downloading."""
+        deps_dir = tmp_path / "deps"
+        deps_dir.mkdir()
+        exe_suffix = '.exe' if platform.system() == 'Windows' else ''
+        for name in ('HandBrakeCLI', 'ffmpeg', 'ffprobe'):
+            (deps_dir / f"{name}{exe_suffix}").write_text("binary")
+
+        result = dependencies_utils.download_dependencies(deps_dir)
+
+        assert None not in result
+        mock_handbrake.assert_not_called()
+        mock_ffmpeg.assert_not_called()
+
+    @patch('dependencies_utils.check_single_dependency', return_value=(True, None))
+    @patch('dependencies_utils.download_ffmpeg')
+    @patch('dependencies_utils.download_handbrake')
+    def test_download_dependencies_force_download(self, mock_handbrake, mock_ffmpeg, mock_check, tmp_path):
+        """Test that force_download downloads even when valid binaries exist."""
+        deps_dir = tmp_path / "deps"
+        deps_dir.mkdir()
+        exe_suffix = '.exe' if platform.system() == 'Windows' else ''
+        for name in ('HandBrakeCLI', 'ffmpeg', 'ffprobe'):
+            (deps_dir / f"{name}{exe_suffix}").write_text("binary")
+        mock_handbrake.return_value = deps_dir / f"HandBrakeCLI{exe_suffix}"
+        mock_ffmpeg.return_value = (deps_dir / f"ffmpeg{exe_suffix}", deps_dir / f"ffprobe{exe_suffix}")
+
+        dependencies_utils.download_dependencies(deps_dir, force_download=True)
+
+        mock_handbrake.assert_called_once()
+        mock_ffmpeg.assert_called_once()
+
+    @patch('dependencies_utils.download_ffmpeg')
+    @patch('dependencies_utils.download_handbrake')
+    def test_download_dependencies_handbrake_failure(self, mock_handbrake, mock_ffmpeg, tmp_path):
+        """Test that a failed HandBrakeCLI download is reported as failure."""
+        mock_handbrake.return_value = None
+        mock_ffmpeg.return_value = (tmp_path / "ffmpeg", tmp_path / "ffprobe")
+
+        result = dependencies_utils.download_dependencies(tmp_path / "deps")
+
+        assert result == (None, None, None)